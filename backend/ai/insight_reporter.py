@@ -22,10 +22,8 @@ class InsightReporter:
     def __init__(self, llm_client: Optional[LiteLLMClient] = None):
         self.llm = llm_client
 
-    async def generate(self, pipeline_result: dict, dataset_analysis: dict, mode: str) -> InsightReport:
-        """Generate a post-run report."""
-        
-        # Heuristics extraction
+    def _heuristics(self, pipeline_result: dict) -> tuple[float, str, str]:
+        """Score and narrate the run from its row counts alone."""
         before = pipeline_result.get("total_rows_before", 0)
         after = pipeline_result.get("total_rows_after", 0)
         removed = pipeline_result.get("total_rows_removed", 0)
@@ -40,17 +38,28 @@ class InsightReporter:
         elif base_score < 7: readiness_label = "Needs Work"
 
         heuristic_narrative = f"You started with {before:,} rows and successfully kept {after:,} rows, removing {removed:,} rows in {dur:.1f}s."
+        return base_score, readiness_label, heuristic_narrative
+
+    def generate_sync(self, pipeline_result: dict, dataset_analysis: dict, mode: str) -> InsightReport:
+        """Generate the heuristic-only report; needs no LLM and no event loop."""
+        base_score, readiness_label, heuristic_narrative = self._heuristics(pipeline_result)
+        return InsightReport(
+            summary=f"The {mode} pipeline has completed. Data has been cleaned.",
+            quality_assessment="The dataset quality looks improved based on heuristics.",
+            recommendations=["Train your model", "Review removed rows"],
+            warnings=pipeline_result.get("warnings", []),
+            stats_narrative=heuristic_narrative,
+            readiness_score=base_score,
+            readiness_label=readiness_label
+        )
+
+    async def generate(self, pipeline_result: dict, dataset_analysis: dict, mode: str) -> InsightReport:
+        """Generate a post-run report."""
         
         if not self.llm:
-             return InsightReport(
-                 summary=f"The {mode} pipeline has completed. Data has been cleaned.",
-                 quality_assessment="The dataset quality looks improved based on heuristics.",
-                 recommendations=["Train your model", "Review removed rows"],
-                 warnings=pipeline_result.get("warnings", []),
-                 stats_narrative=heuristic_narrative,
-                 readiness_score=base_score,
-                 readiness_label=readiness_label
-             )
+             return self.generate_sync(pipeline_result, dataset_analysis, mode)
+
+        base_score, readiness_label, heuristic_narrative = self._heuristics(pipeline_result)
 
         # LLM Enhanced
         prompt = f"""You are analyzing a data cleaning pipeline result.
@@ -56,6 +56,13 @@ def download_file(bucket: str, key: str) -> BytesIO:
     return data
 
 
+def download_to_path(bucket: str, key: str, local_path: str) -> str:
+    """Stream an object from MinIO straight to a local file. Returns the path."""
+    client = get_minio_client()
+    client.fget_object(bucket, key, local_path)
+    return local_path
+
+
 def get_presigned_url(bucket: str, key: str, expires: int = 3600) -> str:
     """Generate a presigned URL for downloading an object."""
     from datetime import timedelta
@@ -1,6 +1,5 @@
 """FastAPI application entry point."""
 
-import asyncio
 import json
 import logging
 from contextlib import asynccontextmanager
@@ -116,84 +115,56 @@ async def health_check() -> dict:
 # WebSocket — Real-time Ingestion Progress
 # ────────────────────────────────────────────────────────
 
+async def _relay_progress_stream(websocket: WebSocket, stream: str, terminal: tuple[str, ...]) -> None:
+    """Forward progress events from a Redis stream until a terminal status.
+
+    Reading from the start of the stream replays events published before the
+    client connected, then XREAD blocks for new ones.
+    """
+    redis_client = aioredis.from_url(settings.REDIS_URL)
+    last_id = "0"
+    try:
+        while True:
+            entries = await redis_client.xread({stream: last_id}, count=100, block=1000)
+            for _, messages in entries:
+                for msg_id, fields in messages:
+                    last_id = msg_id
+                    data = fields.get(b"data", b"").decode("utf-8")
+                    await websocket.send_text(data)
+
+                    try:
+                        if json.loads(data).get("status") in terminal:
+                            return
+                    except json.JSONDecodeError:
+                        pass
+    finally:
+        await redis_client.close()
+
+
 @app.websocket("/api/ws/ingestion/{dataset_id}")
 async def ws_ingestion_progress(websocket: WebSocket, dataset_id: str):
-    """WebSocket endpoint for real-time ingestion progress via Redis pub/sub."""
+    """WebSocket endpoint for real-time ingestion progress via a Redis stream."""
     await websocket.accept()
     logger.info("WebSocket connected for dataset: %s", dataset_id)
 
-    redis_client = aioredis.from_url(settings.REDIS_URL)
-    pubsub = redis_client.pubsub()
-    channel = f"ingestion:{dataset_id}"
-
     try:
-        await pubsub.subscribe(channel)
-
-        while True:
-            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-            if message and message["type"] == "message":
-                data = message["data"]
-                if isinstance(data, bytes):
-                    data = data.decode("utf-8")
-                await websocket.send_text(data)
-
-                # Check if done
-                try:
-                    parsed = json.loads(data)
-                    if parsed.get("status") in ("ready", "failed"):
-                        break
-                except json.JSONDecodeError:
-                    pass
-
-            # Small sleep to prevent tight loop
-            await asyncio.sleep(0.1)
-
+        await _relay_progress_stream(websocket, f"ingestion:{dataset_id}:stream", ("ready", "failed"))
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected for dataset: %s", dataset_id)
     except Exception as exc:
         logger.error("WebSocket error for dataset %s: %s", dataset_id, exc)
-    finally:
-        await pubsub.unsubscribe(channel)
-        await pubsub.close()
-        await redis_client.close()
 
 
 @app.websocket("/api/ws/job/{job_id}")
 async def ws_job_progress(websocket: WebSocket, job_id: str):
-    """WebSocket endpoint for real-time job/pipeline progress via Redis pub/sub."""
+    """WebSocket endpoint for real-time job/pipeline progress via a Redis stream."""
     await websocket.accept()
     logger.info("WebSocket connected for job: %s", job_id)
 
-    redis_client = aioredis.from_url(settings.REDIS_URL)
-    pubsub = redis_client.pubsub()
-    channel = f"job:{job_id}"
-
     try:
-        await pubsub.subscribe(channel)
-
-        while True:
-            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-            if message and message["type"] == "message":
-                data = message["data"]
-                if isinstance(data, bytes):
-                    data = data.decode("utf-8")
-                await websocket.send_text(data)
-
-                try:
-                    parsed = json.loads(data)
-                    if parsed.get("status") in ("completed", "failed"):
-                        break
-                except json.JSONDecodeError:
-                    pass
-
-            await asyncio.sleep(0.1)
-
+        await _relay_progress_stream(websocket, f"job:{job_id}:stream", ("completed", "failed"))
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected for job: %s", job_id)
     except Exception as exc:
         logger.error("WebSocket error for job %s: %s", job_id, exc)
-    finally:
-        await pubsub.unsubscribe(channel)
-        await pubsub.close()
-        await redis_client.close()
 
@@ -7,9 +7,13 @@ from typing import Any
 import pandas as pd
 
 
-@dataclass
+@dataclass(slots=True)
 class StepResult:
-    """Result of a single pipeline step execution."""
+    """Result of a single pipeline step execution.
+
+    Slotted: one is created per step (per chunk when streaming), and the
+    runner only ever reads and sets the declared fields.
+    """
 
     df: pd.DataFrame
     rows_before: int
@@ -17,6 +21,7 @@ class StepResult:
     rows_removed: int
     metadata: dict[str, Any] = field(default_factory=dict)
     warnings: list[str] = field(default_factory=list)
+    duration_seconds: float = 0.0  # set by the runner
 
     @property
     def summary(self) -> str:
@@ -29,11 +34,16 @@ class PipelineStep(ABC):
     Every step:
     - Takes a DataFrame + config dict
     - Returns a StepResult with a NEW DataFrame (never modifies in place)
+    - Replaces whole columns instead of writing into them, so it can start
+      from a shallow df.copy(deep=False)
     - Is stateless and independently testable
     """
 
     name: str = "unnamed_step"
     description: str = ""
+    # Fine-tuning steps that read the formatter's _norm_* columns set this so
+    # the runner keeps those columns instead of normalizing again
+    requires_normalized: bool = False
 
     @abstractmethod
     def run(self, df: pd.DataFrame, config: dict) -> StepResult:
@@ -52,6 +62,20 @@ class PipelineStep(ABC):
         """Validate step configuration. Raise ValueError if invalid."""
         pass
 
+    def run_chunk(self, df: pd.DataFrame, config: dict, state: dict) -> StepResult:
+        """Execute the step on one chunk of a streamed (out-of-core) run.
+
+        `state` is the same dict for every chunk of a run. Row-local steps
+        need none of it, so by default this is just run(); steps whose result
+        depends on earlier rows (e.g. deduplication) override it.
+        """
+        return self.run(df, config)
+
+
+def text_columns(df: pd.DataFrame) -> list[str]:
+    """Columns holding text: Python object columns and pandas string (incl. Arrow-backed) columns."""
+    return list(df.select_dtypes(include=["object", "string"]).columns)
+
 
 # Step registry for lookup by name
 STEP_REGISTRY: dict[str, type[PipelineStep]] = {}
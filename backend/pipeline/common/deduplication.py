@@ -1,15 +1,33 @@
-"""Deduplication pipeline step — exact (SHA256) and optional semantic dedup."""
+"""Deduplication pipeline step — exact and optional semantic dedup."""
 
-import hashlib
 import logging
+import zlib
+from collections import defaultdict
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 from pipeline.common.base import PipelineStep, StepResult, register_step
 
 logger = logging.getLogger(__name__)
 
+try:
+    import polars as pl
+except ImportError:  # optional: polars (see requirements-optional.txt)
+    pl = None
+
+try:
+    import xxhash
+except ImportError:  # optional: xxhash (see requirements-optional.txt)
+    xxhash = None
+
+# MinHash/LSH parameters for the dependency-free near-duplicate fallback:
+# 16 bands of 8 rows puts the 50% candidate point near Jaccard 0.7
+_MINHASH_PERMS = 128
+_MINHASH_BANDS = 16
+_MINHASH_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+
 
 def _has_semantic_deps() -> bool:
     """Check if sentence-transformers and faiss are installed."""
@@ -21,6 +39,93 @@ def _has_semantic_deps() -> bool:
         return False
 
 
+def _shingles(text: str, k: int = 5) -> set[str]:
+    """Character k-grams of `text`; short texts become a single shingle."""
+    if len(text) <= k:
+        return {text}
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def _exact_duplicates(df: pd.DataFrame, cols: list[str], keep: str) -> pd.Series:
+    """Flag rows whose string-rendered values in `cols` repeat an earlier (or later) row.
+
+    duplicated() factorizes each column in C and compares the combined codes,
+    so there is no per-row Python hashing and no false matches from joining
+    values with a separator. Values are compared as strings, which also copes
+    with unhashable cells such as lists parsed from JSON.
+    """
+    if pl is not None:
+        try:
+            return _exact_duplicates_polars(df, cols, keep)
+        except (pl.exceptions.PolarsError, TypeError, ValueError) as exc:
+            # Mixed-type or nested object columns have no Arrow equivalent
+            logger.debug("polars dedup unavailable for these columns (%s); using pandas", exc)
+    if xxhash is not None:
+        dup = _exact_duplicates_xxhash(df, cols, keep)
+        if dup is not None:
+            return dup
+    return df[cols].astype(str).duplicated(keep=keep)
+
+
+def _xxh3_row_hash(values: list[np.ndarray], n_rows: int) -> np.ndarray:
+    """One uint64 per row: the xxh3 digests of each column's string values, mixed per row.
+
+    Per-column digests are combined instead of hashing a separator-joined
+    string, which could make distinct rows identical.
+    """
+    digest = xxhash.xxh3_64_intdigest
+    row_hash = np.zeros(n_rows, dtype=np.uint64)
+    for col_values in values:
+        col_hash = np.fromiter(map(digest, col_values), dtype=np.uint64, count=len(col_values))
+        row_hash = row_hash * np.uint64(0x100000001B3) ^ col_hash
+    return row_hash
+
+
+def _row_digests(df: pd.DataFrame, cols: list[str]) -> tuple[np.ndarray, str]:
+    """64-bit digest per row of the string-rendered `cols`, and the name of the hash used."""
+    if xxhash is not None:
+        return _xxh3_row_hash([df[c].astype(str).to_numpy() for c in cols], len(df)), "xxh3_64"
+    return pd.util.hash_pandas_object(df[cols].astype(str), index=False).to_numpy(), "hash_pandas_object"
+
+
+def _exact_duplicates_xxhash(df: pd.DataFrame, cols: list[str], keep: str) -> Optional[pd.Series]:
+    """Same as `_exact_duplicates`, keyed on one xxh3 digest per row.
+
+    Hashing each string once with xxh3 is several times cheaper than the
+    SipHash pandas pays per cell, and duplicated() then only sees uint64s.
+    Rows that share a digest are compared value by value afterwards; returns
+    None on a genuine 64-bit collision so the caller can use the exact path.
+    """
+    values = [df[c].astype(str).to_numpy() for c in cols]
+    codes, uniques = pd.factorize(_xxh3_row_hash(values, len(df)))
+    group_size = np.bincount(codes, minlength=len(uniques))
+    shared = np.flatnonzero(group_size[codes] > 1)
+    if len(shared):
+        _, first_pos = np.unique(codes, return_index=True)
+        rep = first_pos[codes[shared]]
+        for col_values in values:
+            if not (col_values[shared] == col_values[rep]).all():
+                return None
+    return pd.Series(pd.Index(codes).duplicated(keep=keep), index=df.index)
+
+
+def _exact_duplicates_polars(df: pd.DataFrame, cols: list[str], keep: str) -> pd.Series:
+    """Same as `_exact_duplicates`, hashing the rows on polars' multithreaded engine.
+
+    Columns are cast to strings inside polars, so large text frames never
+    build a Python str per cell on the pandas side.
+    """
+    frame = pl.from_pandas(df[cols]).select(pl.all().cast(pl.String))
+    row = pl.struct(pl.all())
+    if keep == "first":
+        dup = ~row.is_first_distinct()
+    elif keep == "last":
+        dup = ~row.is_last_distinct()
+    else:
+        dup = row.is_duplicated()
+    return pd.Series(frame.select(dup).to_series().to_numpy(), index=df.index)
+
+
 @register_step
 class DeduplicationStep(PipelineStep):
     name = "deduplication"
@@ -31,7 +136,10 @@ class DeduplicationStep(PipelineStep):
         if method not in ("exact", "semantic", "both"):
             raise ValueError(f"Invalid method: {method}. Use 'exact', 'semantic', or 'both'.")
         if method in ("semantic", "both") and not _has_semantic_deps():
-            logger.warning("sentence-transformers/faiss not installed — semantic dedup will fall back to exact.")
+            logger.warning(
+                "sentence-transformers/faiss not installed — semantic dedup will fall back to "
+                "MinHash near-duplicate detection."
+            )
 
     def run(self, df: pd.DataFrame, config: dict) -> StepResult:
         rows_before = len(df)
@@ -50,15 +158,11 @@ class DeduplicationStep(PipelineStep):
                 warnings.append("Specified columns not found, using all columns")
 
         keep = config.get("keep", "first")
-        result_df = df.copy()
+        result_df = df.copy(deep=False)
 
         # ── Exact deduplication ──
         if method in ("exact", "both"):
-            # Hash rows for dedup
-            hashes = result_df[cols].astype(str).apply(
-                lambda row: hashlib.sha256("|".join(row).encode()).hexdigest(), axis=1
-            )
-            mask = ~hashes.duplicated(keep=keep)
+            mask = ~_exact_duplicates(result_df, cols, keep)
             exact_removed = (~mask).sum()
             result_df = result_df[mask].reset_index(drop=True)
             logger.info("Exact dedup: removed %d rows", exact_removed)
@@ -68,17 +172,15 @@ class DeduplicationStep(PipelineStep):
             if not _has_semantic_deps():
                 warnings.append(
                     "sentence-transformers/faiss not installed. "
-                    "Falling back to exact dedup only. "
+                    "Falling back to MinHash near-duplicate detection. "
                     "Install with: pip install -r requirements-optional.txt"
                 )
                 if method == "semantic" and exact_removed == 0:
-                    # Run exact as fallback
-                    hashes = result_df[cols].astype(str).apply(
-                        lambda row: hashlib.sha256("|".join(row).encode()).hexdigest(), axis=1
-                    )
-                    mask = ~hashes.duplicated(keep=keep)
+                    # Run exact first; it is cheap and leaves fewer rows to shingle
+                    mask = ~_exact_duplicates(result_df, cols, keep)
                     exact_removed = (~mask).sum()
                     result_df = result_df[mask].reset_index(drop=True)
+                result_df, semantic_removed = self._minhash_dedup(result_df, cols, config)
             else:
                 result_df, semantic_removed = self._semantic_dedup(
                     result_df, cols, config, warnings
@@ -93,12 +195,117 @@ class DeduplicationStep(PipelineStep):
             metadata={
                 "exact_duplicates_removed": exact_removed,
                 "semantic_duplicates_removed": semantic_removed,
-                "method_used": method if _has_semantic_deps() or method == "exact" else "exact (fallback)",
+                "method_used": method if _has_semantic_deps() or method == "exact" else "minhash (fallback)",
                 "columns_checked": cols,
             },
             warnings=warnings,
         )
 
+    def run_chunk(self, df: pd.DataFrame, config: dict, state: dict) -> StepResult:
+        """Exact dedup of one streamed chunk, also dropping rows seen in earlier chunks.
+
+        Earlier rows are remembered as a sorted array of 64-bit row digests
+        (8 bytes per distinct row) rather than the rows themselves, so memory
+        stays far below holding the data. The price is that cross-chunk matches
+        cannot be verified against the original values: two distinct rows with
+        the same digest (odds around n²/2⁶⁵ for n rows) would drop the later
+        one. The metadata records this under `cross_chunk_matching`.
+        """
+        if config.get("method", "exact") != "exact" or config.get("keep", "first") != "first":
+            raise ValueError("Streaming runs support only exact deduplication with keep='first'")
+
+        result = self.run(df, config)
+        cols = result.metadata["columns_checked"]
+        digests, hash_name = _row_digests(result.df, cols)
+        seen = state.get("seen_digests", np.empty(0, dtype=np.uint64))
+        if len(seen):
+            pos = np.minimum(np.searchsorted(seen, digests), len(seen) - 1)
+            earlier = seen[pos] == digests
+        else:
+            earlier = np.zeros(len(digests), dtype=bool)
+        # Sort only this chunk's new digests and merge them in (linear), rather than re-sorting everything seen
+        new = np.sort(digests[~earlier])
+        state["seen_digests"] = np.insert(seen, np.searchsorted(seen, new), new)
+
+        result_df = result.df[~earlier].reset_index(drop=True)
+        result.metadata["exact_duplicates_removed"] += int(earlier.sum())
+        result.metadata["cross_chunk_matching"] = f"{hash_name} row digest, unverified"
+        rows_after = len(result_df)
+        return StepResult(
+            df=result_df,
+            rows_before=result.rows_before,
+            rows_after=rows_after,
+            rows_removed=result.rows_before - rows_after,
+            metadata=result.metadata,
+            warnings=result.warnings,
+        )
+
+    def _minhash_dedup(self, df: pd.DataFrame, cols: list[str], config: dict) -> tuple[pd.DataFrame, int]:
+        """Near-duplicate removal with MinHash + LSH banding; needs only NumPy.
+
+        Rows are shingled into character 5-grams and summarised by 128 MinHash
+        values. A row's candidates are the kept rows that share any of its 16
+        bands (8 values each); a candidate is confirmed by the exact Jaccard
+        similarity of their shingle sets, so no pairwise pass over all rows
+        is needed.
+        """
+        threshold = config.get("minhash_threshold", 0.85)
+        keep = config.get("keep", "first")
+        if len(df) < 2:
+            return df, 0
+
+        texts = df[cols].astype(str).apply(lambda row: " ".join(row), axis=1).str.lower().tolist()
+        shingles = [_shingles(t) for t in texts]
+
+        rng = np.random.default_rng(1)
+        a = rng.integers(1, _MINHASH_PRIME, size=_MINHASH_PERMS, dtype=np.uint64)
+        b = rng.integers(0, _MINHASH_PRIME, size=_MINHASH_PERMS, dtype=np.uint64)
+
+        band_keys: list[list[tuple[int, bytes]]] = []
+        for sh in shingles:
+            h = np.fromiter((zlib.crc32(x.encode()) for x in sh), dtype=np.uint64, count=len(sh))
+            # a, h < 2**32, so a * h + b stays within uint64
+            sig = ((a[:, None] * h[None, :] + b[:, None]) % _MINHASH_PRIME).min(axis=1)
+            band_keys.append([(band, chunk.tobytes()) for band, chunk in enumerate(sig.reshape(_MINHASH_BANDS, -1))])
+
+        def similar(i: int, j: int) -> bool:
+            inter = len(shingles[i] & shingles[j])
+            return inter / (len(shingles[i]) + len(shingles[j]) - inter) >= threshold
+
+        # Each row is compared only with the rows kept so far that share one of
+        # its bands. A cluster of near-duplicates keeps a single representative,
+        # so it costs one comparison per row rather than one per pair. With
+        # keep=False the representative stays in its buckets to catch later
+        # copies, but is itself removed once a match is found.
+        kept_in_bucket: defaultdict[tuple[int, bytes], list[int]] = defaultdict(list)
+        to_remove: set[int] = set()
+        order = range(len(df) - 1, -1, -1) if keep == "last" else range(len(df))
+        for i in order:
+            checked: set[int] = set()
+            matches: list[int] = []
+            for key in band_keys[i]:
+                for rep in kept_in_bucket.get(key, ()):
+                    if rep not in checked:
+                        checked.add(rep)
+                        if similar(i, rep):
+                            matches.append(rep)
+                            if keep is not False:
+                                break
+                if matches and keep is not False:
+                    break
+            if matches:
+                to_remove.add(i)
+                if keep is False:
+                    to_remove.update(matches)
+            else:
+                for key in band_keys[i]:
+                    kept_in_bucket[key].append(i)
+
+        if to_remove:
+            df = df.drop(index=df.index[sorted(to_remove)]).reset_index(drop=True)
+        logger.info("MinHash dedup: removed %d rows (threshold=%.2f)", len(to_remove), threshold)
+        return df, len(to_remove)
+
     def _semantic_dedup(
         self, df: pd.DataFrame, cols: list[str], config: dict, warnings: list[str]
     ) -> tuple[pd.DataFrame, int]:
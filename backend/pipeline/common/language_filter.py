@@ -6,7 +6,7 @@ import pandas as pd
 from langdetect import detect, DetectorFactory
 from langdetect.lang_detect_exception import LangDetectException
 
-from pipeline.common.base import PipelineStep, StepResult, register_step
+from pipeline.common.base import PipelineStep, StepResult, register_step, text_columns
 
 logger = logging.getLogger(__name__)
 
@@ -33,11 +33,11 @@ class LanguageFilterStep(PipelineStep):
         text_column = config.get("text_column", "auto")
         tag_col = config.get("tag_column_name", "language")
 
-        result_df = df.copy()
+        result_df = df.copy(deep=False)
 
         # Auto-detect text column
         if text_column == "auto":
-            text_cols = result_df.select_dtypes(include=["object"]).columns
+            text_cols = text_columns(result_df)
             if len(text_cols) == 0:
                 warnings.append("No text columns found for language detection.")
                 return StepResult(df=result_df, rows_before=rows_before, rows_after=rows_before,
@@ -77,20 +77,19 @@ class LanguageFilterStep(PipelineStep):
         lang_dist = result_df[tag_col].value_counts().to_dict()
 
         # Apply filter
-        rows_removed = 0
         if action == "filter_keep":
             mask = result_df[tag_col].isin(languages)
             result_df = result_df[mask].reset_index(drop=True)
-            rows_removed = rows_before - len(result_df)
         elif action == "filter_remove":
             mask = ~result_df[tag_col].isin(languages)
             result_df = result_df[mask].reset_index(drop=True)
-            rows_removed = rows_before - len(result_df)
+        rows_after = len(result_df)
+        rows_removed = rows_before - rows_after
 
         return StepResult(
             df=result_df,
             rows_before=rows_before,
-            rows_after=len(result_df),
+            rows_after=rows_after,
             rows_removed=rows_removed,
             metadata={
                 "language_distribution": lang_dist,
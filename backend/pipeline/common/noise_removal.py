@@ -6,98 +6,141 @@ import unicodedata
 
 import pandas as pd
 
-from pipeline.common.base import PipelineStep, StepResult, register_step
+from pipeline.common.base import PipelineStep, StepResult, register_step, text_columns
 
 logger = logging.getLogger(__name__)
 
 
+_ZERO_WIDTH = re.compile(r"[\u200b\u200c\u200d\ufeff\u00ad]")
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+# Both of the above are plain deletions, so with both options on they share one pass
+_ZERO_WIDTH_AND_CONTROL = re.compile(r"[\u200b\u200c\u200d\ufeff\u00ad\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_HSPACE = re.compile(r"[ \t]+")
+_MULTI_NEWLINE = re.compile(r"\n{3,}")
+_URLS = re.compile(r"https?://[^\s<>\"']+|www\.[^\s<>\"']+")
+# The only ASCII input ftfy.fix_text changes: HTML entities, \r and C0/DEL controls (\t, \n, \f are kept)
+_FTFY_ASCII_TRIGGERS = re.compile(r"[&\x00-\x08\x0b\x0d-\x1f\x7f]")
+
+
 @register_step
 class NoiseRemovalStep(PipelineStep):
     name = "noise_removal"
     description = "Clean text: fix encoding, strip HTML, normalize whitespace and unicode"
 
+    def __init__(self) -> None:
+        # Compiled custom patterns, kept across runs of the same step instance
+        self._custom_cache: dict[str, re.Pattern] = {}
+
+    def _compile_custom(self, patterns: list[str], warnings: list[str]) -> list[re.Pattern]:
+        compiled = []
+        for pattern in patterns:
+            if pattern not in self._custom_cache:
+                try:
+                    self._custom_cache[pattern] = re.compile(pattern)
+                except re.error as exc:
+                    warnings.append(f"Invalid regex pattern '{pattern}': {exc}")
+                    continue
+            compiled.append(self._custom_cache[pattern])
+        return compiled
+
     def run(self, df: pd.DataFrame, config: dict) -> StepResult:
         rows_before = len(df)
         warnings: list[str] = []
 
         columns = config.get("columns", "all_text")
         if columns == "all_text":
-            text_cols = list(df.select_dtypes(include=["object"]).columns)
+            text_cols = text_columns(df)
         else:
             text_cols = [c for c in columns if c in df.columns]
 
         if not text_cols:
             warnings.append("No text columns found for noise removal.")
-            return StepResult(df=df.copy(), rows_before=rows_before, rows_after=rows_before,
+            return StepResult(df=df.copy(deep=False), rows_before=rows_before, rows_after=rows_before,
                               rows_removed=0, metadata={}, warnings=warnings)
 
-        result_df = df.copy()
+        result_df = df.copy(deep=False)
         encoding_fixes = 0
         html_stripped = 0
         total_chars_cleaned = 0
 
+        # Resolve options, optional imports and patterns once per run, not per cell
+        fix_text = None
+        if config.get("fix_encoding", True):
+            try:
+                from ftfy import fix_text
+            except ImportError:
+                warnings.append("ftfy not installed, skipping encoding fixes.")
+        beautiful_soup = None
+        if config.get("strip_html", True):
+            from bs4 import BeautifulSoup as beautiful_soup
+        normalize_unicode = config.get("normalize_unicode", True)
+        remove_control = config.get("remove_control_chars", True)
+        normalize_ws = config.get("normalize_whitespace", True)
+        strip_urls = config.get("strip_urls", False)
+        custom = self._compile_custom(config.get("custom_patterns", []), warnings)
+        if normalize_unicode and remove_control:
+            deletions = _ZERO_WIDTH_AND_CONTROL
+        else:
+            deletions = _ZERO_WIDTH if normalize_unicode else _CONTROL_CHARS if remove_control else None
+        # fix_text is pure Python and slow; repeated cells are fixed only once per run
+        fixed_cache: dict[str, str] = {}
+
+        def clean(text: str) -> str:
+            nonlocal encoding_fixes, html_stripped
+            cleaned = text
+
+            # 1. Fix encoding
+            if fix_text is not None and (not cleaned.isascii() or _FTFY_ASCII_TRIGGERS.search(cleaned)):
+                fixed = fixed_cache.get(cleaned)
+                if fixed is None:
+                    fixed = fixed_cache[cleaned] = fix_text(cleaned)
+                if fixed != cleaned:
+                    encoding_fixes += 1
+                    cleaned = fixed
+
+            # 2. Strip HTML
+            if beautiful_soup is not None and "<" in cleaned and ">" in cleaned:
+                stripped = beautiful_soup(cleaned, "html.parser").get_text(separator=" ")
+                if stripped != cleaned:
+                    html_stripped += 1
+                    cleaned = stripped
+
+            # 3. Normalize unicode
+            if normalize_unicode:
+                cleaned = unicodedata.normalize("NFC", cleaned)
+
+            # 4. Remove zero-width (3.) and control characters (keep \n, \t)
+            if deletions is not None:
+                cleaned = deletions.sub("", cleaned)
+
+            # 5. Normalize whitespace. Every single space is a _HSPACE match, so
+            # only run the regexes when there is something for them to change.
+            if normalize_ws:
+                if "  " in cleaned or "\t" in cleaned:
+                    cleaned = _HSPACE.sub(" ", cleaned)
+                if "\n\n\n" in cleaned:
+                    cleaned = _MULTI_NEWLINE.sub("\n\n", cleaned)
+                cleaned = cleaned.strip()
+
+            # 6. Strip URLs
+            if strip_urls:
+                cleaned = _URLS.sub("", cleaned)
+
+            # 7. Custom patterns
+            for pattern in custom:
+                cleaned = pattern.sub("", cleaned)
+
+            return cleaned
+
         for col in text_cols:
-            for idx in result_df.index:
-                text = result_df.at[idx, col]
-                if pd.isna(text) or not isinstance(text, str):
+            values = result_df[col].tolist()
+            for i, text in enumerate(values):
+                if not isinstance(text, str):
                     continue
-
-                original_len = len(text)
-                cleaned = text
-
-                # 1. Fix encoding
-                if config.get("fix_encoding", True):
-                    try:
-                        import ftfy
-                        fixed = ftfy.fix_text(cleaned)
-                        if fixed != cleaned:
-                            encoding_fixes += 1
-                            cleaned = fixed
-                    except ImportError:
-                        if not hasattr(self, "_ftfy_warned"):
-                            warnings.append("ftfy not installed, skipping encoding fixes.")
-                            self._ftfy_warned = True
-
-                # 2. Strip HTML
-                if config.get("strip_html", True):
-                    if "<" in cleaned and ">" in cleaned:
-                        from bs4 import BeautifulSoup
-                        soup = BeautifulSoup(cleaned, "html.parser")
-                        stripped = soup.get_text(separator=" ")
-                        if stripped != cleaned:
-                            html_stripped += 1
-                            cleaned = stripped
-
-                # 3. Normalize unicode
-                if config.get("normalize_unicode", True):
-                    cleaned = unicodedata.normalize("NFC", cleaned)
-                    # Remove zero-width characters
-                    cleaned = re.sub(r"[\u200b\u200c\u200d\ufeff\u00ad]", "", cleaned)
-
-                # 4. Remove control characters (keep \n, \t)
-                if config.get("remove_control_chars", True):
-                    cleaned = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]", "", cleaned)
-
-                # 5. Normalize whitespace
-                if config.get("normalize_whitespace", True):
-                    cleaned = re.sub(r"[ \t]+", " ", cleaned)
-                    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
-                    cleaned = cleaned.strip()
-
-                # 6. Strip URLs
-                if config.get("strip_urls", False):
-                    cleaned = re.sub(r"https?://[^\s<>\"']+", "", cleaned)
-                    cleaned = re.sub(r"www\.[^\s<>\"']+", "", cleaned)
-
-                # 7. Custom patterns
-                for pattern in config.get("custom_patterns", []):
-                    try:
-                        cleaned = re.sub(pattern, "", cleaned)
-                    except re.error as exc:
-                        warnings.append(f"Invalid regex pattern '{pattern}': {exc}")
-
-                total_chars_cleaned += abs(original_len - len(cleaned))
-                result_df.at[idx, col] = cleaned
+                cleaned = clean(text)
+                total_chars_cleaned += abs(len(text) - len(cleaned))
+                values[i] = cleaned
+            result_df[col] = pd.Series(values, index=result_df.index, dtype=result_df[col].dtype)
 
         # 8. Length filtering
         min_len = config.get("min_text_length", 0)
@@ -2,11 +2,12 @@
 
 import logging
 import re
+from functools import lru_cache
 from typing import Optional
 
 import pandas as pd
 
-from pipeline.common.base import PipelineStep, StepResult, register_step
+from pipeline.common.base import PipelineStep, StepResult, register_step, text_columns
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,63 @@ PII_PATTERNS = {
     "URL": r"https?://[^\s<>\"']+|www\.[^\s<>\"']+",
 }
 
+_COMPILED_PATTERNS = {k: re.compile(v, re.IGNORECASE) for k, v in PII_PATTERNS.items()}
+
+# Literals every match must contain (checked against lower-cased text);
+# the remaining patterns all need at least one digit
+_LITERAL_ANCHORS = {
+    "EMAIL": ("@",),
+    "URL": ("http", "www."),
+}
+_DIGIT = re.compile(r"\d")
+
+try:
+    import re2
+except ImportError:  # optional: google-re2 (see requirements-optional.txt)
+    re2 = None
+
+
+@lru_cache(maxsize=16)
+def _build_prefilter(entity_types: tuple[str, ...]):
+    """Compile the selected patterns into one RE2 set that reports which of them occur.
+
+    Returns None when google-re2 is not installed; callers then fall back to
+    _anchored_candidates(), as they do for non-ASCII text.
+    """
+    if re2 is None or not entity_types:
+        return None
+    options = re2.Options()
+    options.case_sensitive = False
+    prefilter = re2.Set.SearchSet(options)
+    for entity_type in entity_types:
+        prefilter.Add(PII_PATTERNS[entity_type])
+    prefilter.Compile()
+    return prefilter
+
+
+def _anchored_candidates(names: list[str], text: str) -> list[str]:
+    """Patterns in `names` whose required anchor occurs in `text`.
+
+    A necessary condition checked with substring tests, so clean text skips
+    the regexes entirely when the RE2 prefilter is unavailable.
+    """
+    candidates = []
+    lowered = None
+    has_digit = None
+    for entity_type in names:
+        anchors = _LITERAL_ANCHORS.get(entity_type)
+        if anchors is None:
+            if has_digit is None:
+                has_digit = _DIGIT.search(text) is not None
+            if has_digit:
+                candidates.append(entity_type)
+        else:
+            if lowered is None:
+                lowered = text.lower()
+            if any(anchor in lowered for anchor in anchors):
+                candidates.append(entity_type)
+    return candidates
+
 
 def _has_presidio() -> bool:
     try:
@@ -51,16 +109,16 @@ class PIIScrubberStep(PipelineStep):
 
         # Determine text columns
         if columns == "all_text":
-            text_cols = list(df.select_dtypes(include=["object"]).columns)
+            text_cols = text_columns(df)
         else:
             text_cols = [c for c in columns if c in df.columns]
 
         if not text_cols:
             warnings.append("No text columns found for PII scanning.")
-            return StepResult(df=df.copy(), rows_before=rows_before, rows_after=rows_before,
+            return StepResult(df=df.copy(deep=False), rows_before=rows_before, rows_after=rows_before,
                               rows_removed=0, metadata={"rows_with_pii": 0}, warnings=warnings)
 
-        result_df = df.copy()
+        result_df = df.copy(deep=False)
         pii_counts: dict[str, int] = {}
         rows_with_pii = 0
         total_instances = 0
@@ -117,12 +175,16 @@ class PIIScrubberStep(PipelineStep):
 
         entity_list = None if "ALL" in entities else entities
 
-        for idx, row in df.iterrows():
+        values = {col: df[col].tolist() for col in text_cols}
+        redacted_cols: set[str] = set()
+
+        for i in range(len(df)):
             row_has_pii = False
             row_entities: list[str] = []
 
             for col in text_cols:
-                text = str(row[col]) if pd.notna(row[col]) else ""
+                value = values[col][i]
+                text = str(value) if pd.notna(value) else ""
                 if not text:
                     continue
 
@@ -143,13 +205,18 @@ class PIIScrubberStep(PipelineStep):
                         if redact_with == "<ENTITY_TYPE>":
                             operators = {}  # Use default which replaces with entity type
                         anonymized = anonymizer.anonymize(text=text, analyzer_results=results, operators=operators)
-                        df.at[idx, col] = anonymized.text
+                        values[col][i] = anonymized.text
+                        redacted_cols.add(col)
 
             if row_has_pii:
                 rows_with_pii += 1
             pii_flags.append(row_has_pii)
             pii_entity_lists.append(",".join(row_entities))
 
+        # Replace whole columns; never write into the (possibly shared) input buffers
+        for col in redacted_cols:
+            df[col] = pd.Series(values[col], index=df.index, dtype=df[col].dtype)
+
         if action in ("remove_row", "flag"):
             df["pii_detected"] = pii_flags
             df["pii_entities"] = pii_entity_lists
@@ -163,21 +230,39 @@ class PIIScrubberStep(PipelineStep):
         pii_flags = []
         pii_entity_lists = []
 
-        patterns = PII_PATTERNS if "ALL" in entities else {
-            k: v for k, v in PII_PATTERNS.items() if k in entities
-        }
+        names = [k for k in PII_PATTERNS if "ALL" in entities or k in entities]
+        prefilter = _build_prefilter(tuple(names))
+        replacement_for = lambda entity_type: f"<{entity_type}>" if redact_with == "<ENTITY_TYPE>" else redact_with
 
-        for idx, row in df.iterrows():
+        values = {col: df[col].tolist() for col in text_cols}
+        redacted_cols: set[str] = set()
+
+        for i in range(len(df)):
             row_has_pii = False
             row_entities: list[str] = []
 
             for col in text_cols:
-                text = str(row[col]) if pd.notna(row[col]) else ""
+                value = values[col][i]
+                text = str(value) if pd.notna(value) else ""
                 if not text:
                     continue
 
-                for entity_type, pattern in patterns.items():
-                    matches = re.findall(pattern, text, re.IGNORECASE)
+                # RE2's \d and \b are ASCII-only while the Python patterns are
+                # Unicode-aware, so only ASCII text can trust an empty prefilter result
+                if prefilter is not None and text.isascii():
+                    # One DFA scan tells us which patterns can match; most rows hit none
+                    hits = prefilter.Match(text)
+                    if not hits:
+                        continue
+                    candidates = [names[h] for h in sorted(hits)]
+                else:
+                    candidates = _anchored_candidates(names, text)
+                    if not candidates:
+                        continue
+
+                for entity_type in candidates:
+                    pattern = _COMPILED_PATTERNS[entity_type]
+                    matches = pattern.findall(text)
                     if matches:
                         row_has_pii = True
                         count = len(matches)
@@ -187,15 +272,18 @@ class PIIScrubberStep(PipelineStep):
                             row_entities.append(entity_type)
 
                         if action == "redact":
-                            replacement = f"<{entity_type}>" if redact_with == "<ENTITY_TYPE>" else redact_with
-                            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-                            df.at[idx, col] = text
+                            text = pattern.sub(replacement_for(entity_type), text)
+                            values[col][i] = text
+                            redacted_cols.add(col)
 
             if row_has_pii:
                 rows_with_pii += 1
             pii_flags.append(row_has_pii)
             pii_entity_lists.append(",".join(row_entities))
 
+        for col in redacted_cols:
+            df[col] = pd.Series(values[col], index=df.index, dtype=df[col].dtype)
+
         if action in ("remove_row", "flag"):
             df["pii_detected"] = pii_flags
             df["pii_entities"] = pii_entity_lists
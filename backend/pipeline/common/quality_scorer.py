@@ -3,16 +3,70 @@
 import logging
 import math
 import re
+import sys
 import time
 from collections import Counter
+from functools import lru_cache
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
-from pipeline.common.base import PipelineStep, StepResult, register_step
+from pipeline.common.base import PipelineStep, StepResult, register_step, text_columns
 
 logger = logging.getLogger(__name__)
 
+_SENTENCE_SPLIT = re.compile(r'[.!?]+')
+
+_SCORE_BIN_LABELS = ["0-2", "2-4", "4-6", "6-8", "8-10"]
+
+# Rows per chunk when counting character classes; bounds the UTF-32 copy of the text
+_CHAR_COUNT_CHUNK = 10_000
+
+
+@lru_cache(maxsize=1)
+def _char_class_table() -> np.ndarray:
+    """Per-code-point flags: bit 0 = str.isalpha(), bit 1 = str.isupper()."""
+    chars = [chr(i) for i in range(sys.maxunicode + 1)]
+    alpha = np.fromiter(map(str.isalpha, chars), dtype=np.uint8, count=len(chars))
+    upper = np.fromiter(map(str.isupper, chars), dtype=np.uint8, count=len(chars))
+    return alpha | (upper << 1)
+
+
+def _char_class_counts(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Count alphabetic and uppercase characters per text without a Python loop per character.
+
+    Each chunk of texts is decoded to one array of code points, classified by
+    table lookup, and summed per text with np.add.reduceat.
+    """
+    table = _char_class_table()
+    alpha = np.empty(len(texts), dtype=np.int64)
+    upper = np.empty(len(texts), dtype=np.int64)
+    for lo in range(0, len(texts), _CHAR_COUNT_CHUNK):
+        chunk = texts[lo:lo + _CHAR_COUNT_CHUNK]
+        codes = np.frombuffer("".join(chunk).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        lens = np.fromiter(map(len, chunk), dtype=np.int64, count=len(chunk))
+        # reduceat sums from each start to the next; empty texts would break that, so skip them
+        nonempty = lens > 0
+        starts = (np.cumsum(lens) - lens)[nonempty]
+        flags = table[codes]
+        for shift, out in ((0, alpha), (1, upper)):
+            counts = np.zeros(len(chunk), dtype=np.int64)
+            if len(starts):
+                counts[nonempty] = np.add.reduceat((flags >> shift) & 1, starts, dtype=np.int64)
+            out[lo:lo + len(chunk)] = counts
+    return alpha, upper
+
+
+def _row_texts(df: pd.DataFrame, text_cols: list[str]) -> list[str]:
+    """Join the non-null text columns of each row with spaces.
+
+    Zips the underlying column arrays so each row is a plain tuple rather
+    than the per-row Series that iterrows() builds.
+    """
+    arrays = [df[c].to_numpy() for c in text_cols]
+    return [" ".join(str(v) for v in values if pd.notna(v)) for values in zip(*arrays)]
+
 
 @register_step
 class QualityScorerStep(PipelineStep):
@@ -39,29 +93,25 @@ class QualityScorerStep(PipelineStep):
         # Determine text columns
         text_cols = config.get("text_columns", "auto")
         if text_cols == "auto":
-            text_cols = list(df.select_dtypes(include=["object"]).columns)
+            text_cols = text_columns(df)
         else:
             text_cols = [c for c in text_cols if c in df.columns]
 
         if not text_cols:
             warnings.append("No text columns found for quality scoring.")
-            result_df = df.copy()
+            result_df = df.copy(deep=False)
             result_df[score_col] = 5.0
             result_df[reason_col] = "No text columns"
             return StepResult(df=result_df, rows_before=rows_before, rows_after=rows_before,
                               rows_removed=0, metadata={}, warnings=warnings)
 
-        result_df = df.copy()
+        result_df = df.copy(deep=False)
         scores: list[float] = []
         reasons: list[str] = []
 
         # ── Heuristic scoring ──
         if method in ("heuristic", "both"):
-            for _, row in result_df.iterrows():
-                text = " ".join(str(row[c]) for c in text_cols if pd.notna(row[c]))
-                score, reason = self._heuristic_score(text)
-                scores.append(score)
-                reasons.append(reason)
+            scores, reasons = self._heuristic_scores(_row_texts(result_df, text_cols))
 
         # ── AI scoring ──
         if method in ("ai", "both"):
@@ -94,24 +144,18 @@ class QualityScorerStep(PipelineStep):
         elif action == "flag" and threshold > 0:
             result_df["quality_flag"] = result_df[score_col] < threshold
 
-        # Score distribution
-        score_dist = {"0-2": 0, "2-4": 0, "4-6": 0, "6-8": 0, "8-10": 0}
-        for s in scores:
-            if s < 2:
-                score_dist["0-2"] += 1
-            elif s < 4:
-                score_dist["2-4"] += 1
-            elif s < 6:
-                score_dist["4-6"] += 1
-            elif s < 8:
-                score_dist["6-8"] += 1
-            else:
-                score_dist["8-10"] += 1
+        # Score distribution: bins are 2 wide, so the bin index is floor(score / 2),
+        # clipped so 10 and out-of-range AI scores land in the end bins
+        score_arr = np.asarray(scores, dtype=np.float64)
+        bucket_idx = np.clip(np.floor(score_arr / 2), 0, 4).astype(np.int64)
+        counts = np.bincount(bucket_idx, minlength=len(_SCORE_BIN_LABELS))
+        score_dist = dict(zip(_SCORE_BIN_LABELS, counts.tolist()))
 
         rows_after = len(result_df)
-        mean_score = sum(scores) / len(scores) if scores else 0
-        sorted_scores = sorted(scores)
-        median_score = sorted_scores[len(sorted_scores) // 2] if sorted_scores else 0
+        mean_score = float(score_arr.mean()) if len(score_arr) else 0
+        mid = len(score_arr) // 2
+        # Upper median; partition selects it in O(n) without a full sort
+        median_score = float(np.partition(score_arr, mid)[mid]) if len(score_arr) else 0
 
         return StepResult(
             df=result_df,
@@ -130,91 +174,85 @@ class QualityScorerStep(PipelineStep):
 
     def _heuristic_score(self, text: str) -> tuple[float, str]:
         """Score text 0-10 based on heuristic quality signals."""
-        if not text or not text.strip():
-            return 0.0, "Empty text"
-
-        reasons: list[str] = []
-        sub_scores: list[float] = []
+        scores, reasons = self._heuristic_scores([text])
+        return scores[0], reasons[0]
+
+    def _heuristic_scores(self, texts: list[str]) -> tuple[list[float], list[str]]:
+        """Score many texts 0-10 at once.
+
+        Character-level features come from pandas string kernels and a
+        code-point lookup table, and the sub-scores and reasons are combined
+        with array arithmetic; only the word and sentence tokenization still
+        runs per row, in a single pass over plain Python lists.
+        """
+        if not texts:
+            return [], []
+        s = pd.Series(texts, dtype=object)
+        length = s.str.len().to_numpy(dtype=np.float64)
+        empty = (s.str.strip().str.len() == 0).to_numpy()
+        alpha, upper = _char_class_counts(texts)
+
+        unique_ratios: list[float] = []
+        sentence_counts: list[int] = []
+        max_repeats: list[int] = []
+        split_sentences = _SENTENCE_SPLIT.split
+        for text in texts:
+            words = text.lower().split()
+            unique_ratios.append(len(set(words)) / len(words) if words else 0.0)
+            sentences = [s.lower() for part in split_sentences(text) if (s := part.strip())]
+            sentence_counts.append(len(sentences))
+            # A set is cheaper than a Counter; only count when some sentence repeats
+            max_repeats.append(max(Counter(sentences).values()) if len(set(sentences)) < len(sentences) else 1)
+        unique_ratio = np.array(unique_ratios)
+        n_sentences = np.array(sentence_counts)
+        max_repeat = np.array(max_repeats)
 
         # 1. Length score (optimal: 50-5000 chars)
-        length = len(text)
-        if length < 10:
-            sub_scores.append(1.0)
-            reasons.append("Very short")
-        elif length < 50:
-            sub_scores.append(4.0)
-            reasons.append("Short")
-        elif length <= 5000:
-            sub_scores.append(10.0)
-        elif length <= 20000:
-            sub_scores.append(7.0)
-            reasons.append("Long")
-        else:
-            sub_scores.append(4.0)
-            reasons.append("Very long")
-
+        length_score = np.select(
+            [length < 10, length < 50, length <= 5000, length <= 20000],
+            [1.0, 4.0, 10.0, 7.0], 4.0,
+        )
         # 2. Vocabulary diversity
-        words = text.lower().split()
-        if len(words) > 0:
-            unique_ratio = len(set(words)) / len(words)
-            vocab_score = min(10.0, unique_ratio * 12)
-            sub_scores.append(vocab_score)
-            if unique_ratio < 0.3:
-                reasons.append("Low vocabulary diversity")
-        else:
-            sub_scores.append(1.0)
-
+        vocab_score = np.minimum(10.0, unique_ratio * 12)
         # 3. Repetition penalty
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip().lower() for s in sentences if s.strip()]
-        if len(sentences) > 1:
-            sent_counts = Counter(sentences)
-            max_repeat = max(sent_counts.values())
-            if max_repeat > 2:
-                rep_score = max(1.0, 10.0 - (max_repeat - 1) * 2)
-                sub_scores.append(rep_score)
-                reasons.append(f"Repeated sentences ({max_repeat}x)")
-            else:
-                sub_scores.append(10.0)
-        else:
-            sub_scores.append(7.0)
-
+        rep_score = np.where(
+            n_sentences > 1,
+            np.where(max_repeat > 2, np.maximum(1.0, 10.0 - (max_repeat - 1) * 2), 10.0),
+            7.0,
+        )
         # 4. Special character ratio
-        alpha_count = sum(1 for c in text if c.isalpha())
-        if len(text) > 0:
-            alpha_ratio = alpha_count / len(text)
-            if alpha_ratio > 0.6:
-                sub_scores.append(10.0)
-            elif alpha_ratio > 0.4:
-                sub_scores.append(7.0)
-            else:
-                sub_scores.append(3.0)
-                reasons.append("High special char ratio")
-        else:
-            sub_scores.append(1.0)
-
+        alpha_ratio = alpha / np.maximum(length, 1)
+        alpha_score = np.select([alpha_ratio > 0.6, alpha_ratio > 0.4], [10.0, 7.0], 3.0)
         # 5. Capitalization consistency
-        upper_count = sum(1 for c in text if c.isupper())
-        if alpha_count > 0:
-            upper_ratio = upper_count / alpha_count
-            if 0.02 <= upper_ratio <= 0.15:
-                sub_scores.append(10.0)
-            elif upper_ratio > 0.5:
-                sub_scores.append(3.0)
-                reasons.append("Excessive caps")
-            else:
-                sub_scores.append(7.0)
-        else:
-            sub_scores.append(5.0)
+        upper_ratio = upper / np.maximum(alpha, 1)
+        caps_score = np.where(
+            alpha > 0,
+            np.select([(upper_ratio >= 0.02) & (upper_ratio <= 0.15), upper_ratio > 0.5], [10.0, 3.0], 7.0),
+            5.0,
+        )
 
         # Weighted average
-        weights = [1.5, 2.0, 2.0, 1.0, 0.5]
-        weighted = sum(s * w for s, w in zip(sub_scores, weights))
-        total_weight = sum(weights[:len(sub_scores)])
-        final_score = round(min(10.0, max(0.0, weighted / total_weight)), 2)
-
-        reason = "; ".join(reasons) if reasons else "Good quality"
-        return final_score, reason
+        weighted = length_score * 1.5 + vocab_score * 2.0 + rep_score * 2.0 + alpha_score * 1.0 + caps_score * 0.5
+        final = np.clip(weighted / 7.0, 0.0, 10.0)
+
+        # Reasons, one column per signal ("" when it does not apply), joined per row
+        repeated = np.full(len(texts), "", dtype=object)
+        repeated_idx = np.flatnonzero((n_sentences > 1) & (max_repeat > 2))
+        repeated[repeated_idx] = [f"Repeated sentences ({k}x)" for k in max_repeat[repeated_idx].tolist()]
+        reason_parts = [
+            np.select([length < 10, length < 50, length > 20000, length > 5000],
+                      ["Very short", "Short", "Very long", "Long"], ""),
+            np.where(unique_ratio < 0.3, "Low vocabulary diversity", ""),
+            repeated,
+            np.where(alpha_ratio <= 0.4, "High special char ratio", ""),
+            np.where((alpha > 0) & (upper_ratio > 0.5), "Excessive caps", ""),
+        ]
+        reasons = ["; ".join(filter(None, parts)) or "Good quality"
+                   for parts in zip(*(p.tolist() for p in reason_parts))]
+        scores = [round(x, 2) for x in final.tolist()]
+        for i in np.flatnonzero(empty).tolist():
+            scores[i], reasons[i] = 0.0, "Empty text"
+        return scores, reasons
 
     def _ai_score_batch(self, df, text_cols, config) -> tuple[list[float], list[str], list[str]]:
         """Score rows using AI (LiteLLM) with batch delay and exponential backoff."""
@@ -236,10 +274,7 @@ class QualityScorerStep(PipelineStep):
         model = config.get("ai_model", "gpt-3.5-turbo")
 
         # Collect texts
-        texts: list[str] = []
-        for _, row in df.iterrows():
-            text = " ".join(str(row[c]) for c in text_cols if pd.notna(row[c]))
-            texts.append(text[:2000])  # Truncate to avoid token limits
+        texts = [text[:2000] for text in _row_texts(df, text_cols)]  # Truncate to avoid token limits
 
         # Process in batches
         for batch_start in range(0, len(texts), batch_size):
@@ -1,13 +1,17 @@
 """Pipeline runner — orchestrates step execution with progress reporting."""
 
 import logging
+import queue
+import threading
 import time
 from dataclasses import dataclass, field
 from typing import Any, Callable, Optional
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
-from pipeline.common.base import PipelineStep, StepResult, STEP_REGISTRY
+from pipeline.common.base import PipelineStep, StepResult, STEP_REGISTRY, text_columns
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +23,118 @@ import pipeline.common.noise_removal  # noqa: F401
 import pipeline.common.quality_scorer  # noqa: F401
 
 
+class _ProgressRelay:
+    """Deliver progress callbacks in order from a background thread.
+
+    Callbacks typically publish to Redis and write to Postgres; queueing them
+    keeps that latency off the step loop. close() flushes the queue, so every
+    update has been delivered by the time run() returns.
+    """
+
+    def __init__(self, callback: Callable[[int, str, str], None]):
+        self._callback = callback
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._drain, name="pipeline-progress", daemon=True)
+        self._thread.start()
+
+    def __call__(self, progress: int, step_name: str, message: str) -> None:
+        self._queue.put((progress, step_name, message))
+
+    def _drain(self) -> None:
+        while (item := self._queue.get()) is not None:
+            try:
+                self._callback(*item)
+            except Exception:
+                logger.exception("Progress callback failed")
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+
+def _to_arrow_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """Store all-string object columns as Arrow-backed strings.
+
+    Arrow keeps the text in contiguous UTF-8 buffers instead of one Python
+    object per cell, which roughly halves memory for text-heavy frames and
+    lets .str operations run on Arrow kernels. Mixed-type columns stay object.
+    """
+    converted = {
+        col: df[col].astype("string[pyarrow]")
+        for col in text_columns(df)
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) == "string"
+    }
+    return df.assign(**converted) if converted else df
+
+
+def _iter_ipc_chunks(input_path: str, chunk_rows: int):
+    """Yield (fraction done, DataFrame) chunks of at most `chunk_rows` rows from an Arrow IPC file.
+
+    The file is memory-mapped and read one record batch at a time, so only
+    the current batch is resident (compressed batches are decoded on access).
+    """
+    with pa.memory_map(input_path) as source:
+        reader = pa.ipc.open_file(source)
+        num_batches = reader.num_record_batches
+        for i in range(num_batches):
+            batch = reader.get_batch(i)
+            for offset in range(0, batch.num_rows, chunk_rows):
+                done = (i + min(offset + chunk_rows, batch.num_rows) / batch.num_rows) / num_batches
+                yield done, batch.slice(offset, chunk_rows).to_pandas()
+
+
+def _output_schema(table: pa.Table, input_schema: pa.Schema) -> pa.Schema:
+    """Writer schema for a streamed run, built from the first output table.
+
+    Input columns keep the types declared in the IPC file, so a column that
+    happens to be all-null in the first chunk is not pinned to Arrow's null
+    type. Columns added by steps take the type seen in `table` (null as string).
+    """
+    fields = []
+    for fld in table.schema:
+        idx = input_schema.get_field_index(fld.name)
+        if idx >= 0:
+            fields.append(input_schema.field(idx))
+        elif pa.types.is_null(fld.type):
+            fields.append(fld.with_type(pa.string()))
+        else:
+            fields.append(fld)
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+def _align_to_schema(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Cast `table` to the writer schema, column by column.
+
+    A step that failed part-way through a streamed run no longer adds its
+    columns to later chunks; those columns are filled with typed nulls.
+    """
+    columns = [
+        table.column(fld.name).cast(fld.type) if fld.name in table.column_names
+        else pa.nulls(table.num_rows, type=fld.type)
+        for fld in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _merge_chunk_metadata(total: dict, chunk: dict, chunk_rows: int, rows_so_far: int) -> dict:
+    """Fold one chunk's step metadata into the running totals.
+
+    Counts (ints, and dicts of ints such as distributions) are summed, floats
+    (averages) are weighted by the chunk's input rows, and anything else keeps
+    the first chunk's value.
+    """
+    for key, value in chunk.items():
+        if key not in total:
+            total[key] = value.copy() if isinstance(value, dict) else value
+        elif isinstance(value, dict) and isinstance(total[key], dict):
+            _merge_chunk_metadata(total[key], value, chunk_rows, rows_so_far)
+        elif isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+            total[key] = total[key] + value
+        elif isinstance(value, float) and rows_so_far + chunk_rows:
+            total[key] = round((total[key] * rows_so_far + value * chunk_rows) / (rows_so_far + chunk_rows), 2)
+    return total
+
+
 @dataclass
 class PipelineRunResult:
     """Result of a complete pipeline run."""
@@ -42,6 +158,7 @@ class PipelineRunner:
         steps: list[dict],
         job_id: str = "",
         progress_callback: Optional[Callable[[int, str, str], None]] = None,
+        arrow_strings: bool = False,
     ) -> PipelineRunResult:
         """Run all pipeline steps in order.
 
@@ -50,87 +167,98 @@ class PipelineRunner:
             steps: List of {"step": "step_name", "config": {...}} dicts.
             job_id: Job ID for logging.
             progress_callback: Callable(progress%, step_name, message).
+            arrow_strings: Convert text columns to Arrow-backed strings before
+                the first step (needs pyarrow).
 
         Returns:
             PipelineRunResult with final DataFrame and per-step results.
         """
         start_time = time.time()
         total_rows_before = len(df)
-        current_df = df.copy()
+        # Steps never modify their input in place, so a shallow copy is enough
+        current_df = _to_arrow_strings(df) if arrow_strings else df.copy(deep=False)
         step_results: list[StepResult] = []
         all_warnings: list[str] = []
         total_steps = len(steps)
 
-        for i, step_config in enumerate(steps):
-            step_name = step_config.get("step", "unknown")
-            config = step_config.get("config", {})
+        relay = _ProgressRelay(progress_callback) if progress_callback else None
+        progress_callback = relay
+        try:
+            for i, step_config in enumerate(steps):
+                step_name = step_config.get("step", "unknown")
+                config = step_config.get("config", {})
 
-            # Calculate progress
-            base_progress = int((i / total_steps) * 100)
-            step_progress = int(((i + 1) / total_steps) * 100)
+                # Calculate progress
+                base_progress = int((i / total_steps) * 100)
+                step_progress = int(((i + 1) / total_steps) * 100)
 
-            logger.info("[%s] Starting step %d/%d: %s", job_id, i + 1, total_steps, step_name)
+                logger.info("[%s] Starting step %d/%d: %s", job_id, i + 1, total_steps, step_name)
 
-            if progress_callback:
-                progress_callback(base_progress, step_name, f"Starting {step_name}...")
+                if progress_callback:
+                    progress_callback(base_progress, step_name, f"Starting {step_name}...")
 
-            # Look up step class
-            step_class = STEP_REGISTRY.get(step_name)
-            if step_class is None:
-                warning = f"Unknown step '{step_name}' — skipped"
-                logger.warning(warning)
-                all_warnings.append(warning)
-                # Add a placeholder result
-                step_results.append(StepResult(
-                    df=current_df,
-                    rows_before=len(current_df),
-                    rows_after=len(current_df),
-                    rows_removed=0,
-                    metadata={"skipped": True, "reason": "unknown step"},
-                    warnings=[warning],
-                ))
-                continue
+                # Look up step class
+                step_class = STEP_REGISTRY.get(step_name)
+                if step_class is None:
+                    warning = f"Unknown step '{step_name}' — skipped"
+                    logger.warning(warning)
+                    all_warnings.append(warning)
+                    # Add a placeholder result
+                    step_results.append(StepResult(
+                        df=current_df,
+                        rows_before=len(current_df),
+                        rows_after=len(current_df),
+                        rows_removed=0,
+                        metadata={"skipped": True, "reason": "unknown step"},
+                        warnings=[warning],
+                    ))
+                    continue
 
-            step_instance: PipelineStep = step_class()
+                step_instance: PipelineStep = step_class()
 
-            try:
-                # Validate config
-                step_instance.validate_config(config)
-
-                # Run step
-                result = step_instance.run(current_df, config)
-                step_results.append(result)
-                current_df = result.df
-                all_warnings.extend(result.warnings)
-
-                logger.info(
-                    "[%s] Step %s complete: %s",
-                    job_id, step_name, result.summary,
-                )
+                try:
+                    # Validate config
+                    step_instance.validate_config(config)
 
-                if progress_callback:
-                    progress_callback(
-                        step_progress, step_name,
-                        f"{step_name}: {result.summary}"
+                    # Run step
+                    step_start = time.time()
+                    result = step_instance.run(current_df, config)
+                    result.duration_seconds = round(time.time() - step_start, 2)
+                    step_results.append(result)
+                    current_df = result.df
+                    all_warnings.extend(result.warnings)
+
+                    logger.info(
+                        "[%s] Step %s complete: %s",
+                        job_id, step_name, result.summary,
                     )
 
-            except Exception as exc:
-                error_msg = f"Step '{step_name}' failed: {exc}"
-                logger.exception(error_msg)
-                all_warnings.append(error_msg)
+                    if progress_callback:
+                        progress_callback(
+                            step_progress, step_name,
+                            f"{step_name}: {result.summary}"
+                        )
 
-                # Add failed result but continue pipeline
-                step_results.append(StepResult(
-                    df=current_df,
-                    rows_before=len(current_df),
-                    rows_after=len(current_df),
-                    rows_removed=0,
-                    metadata={"skipped": True, "reason": str(exc)},
-                    warnings=[error_msg],
-                ))
+                except Exception as exc:
+                    error_msg = f"Step '{step_name}' failed: {exc}"
+                    logger.exception(error_msg)
+                    all_warnings.append(error_msg)
 
-                if progress_callback:
-                    progress_callback(step_progress, step_name, f"{step_name}: SKIPPED ({exc})")
+                    # Add failed result but continue pipeline
+                    step_results.append(StepResult(
+                        df=current_df,
+                        rows_before=len(current_df),
+                        rows_after=len(current_df),
+                        rows_removed=0,
+                        metadata={"skipped": True, "reason": str(exc)},
+                        warnings=[error_msg],
+                    ))
+
+                    if progress_callback:
+                        progress_callback(step_progress, step_name, f"{step_name}: SKIPPED ({exc})")
+        finally:
+            if relay:
+                relay.close()
 
         duration = time.time() - start_time
         total_rows_after = len(current_df)
@@ -148,3 +276,169 @@ class PipelineRunner:
             warnings=all_warnings,
             duration_seconds=round(duration, 2),
         )
+
+    def run_streaming(
+        self,
+        input_path: str,
+        output_path: str,
+        steps: list[dict],
+        job_id: str = "",
+        progress_callback: Optional[Callable[[int, str, str], None]] = None,
+        chunk_rows: int = 100_000,
+        arrow_strings: bool = False,
+    ) -> PipelineRunResult:
+        """Run all pipeline steps over an Arrow IPC file chunk by chunk.
+
+        Peak memory follows `chunk_rows` instead of the dataset size: each
+        chunk goes through every step (via PipelineStep.run_chunk) and is
+        appended to `output_path`, also an Arrow IPC file. A step that fails
+        on a chunk is skipped for the rest of the run; its result is marked
+        `partial` with the chunks it was applied to, and a warning is added.
+
+        Args:
+            input_path: Arrow IPC / feather v2 file to read.
+            output_path: Arrow IPC file to write the processed rows to.
+            steps: List of {"step": "step_name", "config": {...}} dicts.
+            job_id: Job ID for logging.
+            progress_callback: Callable(progress%, step_name, message).
+            chunk_rows: Maximum rows per chunk.
+            arrow_strings: Convert text columns to Arrow-backed strings in
+                every chunk.
+
+        Returns:
+            PipelineRunResult whose df is an empty frame with the output
+            columns; the rows are in `output_path`. Step metadata is merged
+            across chunks.
+        """
+        start_time = time.time()
+        total_rows_before = 0
+        total_rows_after = 0
+        num_chunks = 0
+
+        step_classes = [STEP_REGISTRY.get(s.get("step", "unknown")) for s in steps]
+        step_instances = [cls() if cls else None for cls in step_classes]
+        step_states: list[dict] = [{} for _ in steps]
+        step_failed: list[Optional[str]] = [None] * len(steps)
+        # Chunks processed before the step failed (0 when it never ran)
+        step_chunks_done = [0] * len(steps)
+        step_totals = [
+            {"rows_before": 0, "rows_after": 0, "rows_removed": 0, "metadata": {}, "warnings": [], "duration_seconds": 0.0}
+            for _ in steps
+        ]
+        all_warnings: list[str] = []
+        for i, (step_config, instance) in enumerate(zip(steps, step_instances)):
+            step_name = step_config.get("step", "unknown")
+            if instance is None:
+                step_failed[i] = f"Unknown step '{step_name}' — skipped"
+                continue
+            try:
+                instance.validate_config(step_config.get("config", {}))
+            except Exception as exc:
+                step_failed[i] = f"Step '{step_name}' failed: {exc}"
+        for message in filter(None, step_failed):
+            logger.warning("[%s] %s", job_id, message)
+            all_warnings.append(message)
+
+        with pa.memory_map(input_path) as source:
+            input_schema = pa.ipc.open_file(source).schema
+
+        relay = _ProgressRelay(progress_callback) if progress_callback else None
+        progress_callback = relay
+        writer = None
+        schema: Optional[pa.Schema] = None
+        output_columns: pd.DataFrame = pd.DataFrame()
+        try:
+            for chunk_idx, (done, chunk) in enumerate(_iter_ipc_chunks(input_path, chunk_rows)):
+                num_chunks += 1
+                total_rows_before += len(chunk)
+                current_df = _to_arrow_strings(chunk) if arrow_strings else chunk
+                for i, step_config in enumerate(steps):
+                    if step_failed[i]:
+                        continue
+                    step_name = step_config.get("step", "unknown")
+                    step_start = time.time()
+                    try:
+                        result = step_instances[i].run_chunk(current_df, step_config.get("config", {}), step_states[i])
+                    except Exception as exc:
+                        step_failed[i] = f"Step '{step_name}' failed on chunk {chunk_idx + 1}: {exc}"
+                        step_chunks_done[i] = chunk_idx
+                        logger.exception(step_failed[i])
+                        all_warnings.append(step_failed[i])
+                        continue
+                    totals = step_totals[i]
+                    _merge_chunk_metadata(totals["metadata"], result.metadata, result.rows_before, totals["rows_before"])
+                    totals["rows_before"] += result.rows_before
+                    totals["rows_after"] += result.rows_after
+                    totals["rows_removed"] += result.rows_removed
+                    totals["warnings"].extend(w for w in result.warnings if w not in totals["warnings"])
+                    totals["duration_seconds"] += time.time() - step_start
+                    current_df = result.df
+
+                # Open the writer on the first non-empty chunk, so the schema
+                # includes the columns the steps added
+                if len(current_df):
+                    table = pa.Table.from_pandas(current_df, preserve_index=False)
+                    if writer is None:
+                        schema = _output_schema(table, input_schema)
+                        writer = pa.ipc.new_file(output_path, schema)
+                        output_columns = current_df.iloc[:0]
+                    writer.write_table(_align_to_schema(table, schema))
+                    total_rows_after += len(current_df)
+                elif writer is None:
+                    output_columns = current_df.iloc[:0]
+
+                if progress_callback:
+                    progress_callback(int(done * 100), "streaming", f"Processed chunk {chunk_idx + 1} ({total_rows_before} rows)")
+
+            if writer is None:
+                # Nothing survived: still leave a valid (empty) output file
+                empty = pa.Table.from_pandas(output_columns, preserve_index=False)
+                writer = pa.ipc.new_file(output_path, _output_schema(empty, input_schema))
+        finally:
+            if writer is not None:
+                writer.close()
+            if relay:
+                relay.close()
+
+        step_results: list[StepResult] = []
+        for i, totals in enumerate(step_totals):
+            if step_failed[i] and not step_chunks_done[i]:
+                step_results.append(StepResult(
+                    df=output_columns,
+                    rows_before=0,
+                    rows_after=0,
+                    rows_removed=0,
+                    metadata={"skipped": True, "reason": step_failed[i]},
+                    warnings=[step_failed[i]],
+                ))
+                continue
+            if step_failed[i]:
+                # The output mixes rows this step processed with rows it never saw
+                chunks_applied = f"1-{step_chunks_done[i]}"
+                totals["metadata"].update({"partial": True, "chunks_applied": chunks_applied, "reason": step_failed[i]})
+                partial_warning = (
+                    f"Step '{steps[i].get('step', 'unknown')}' was only applied to chunks {chunks_applied} "
+                    f"of {num_chunks}; later rows were written without it"
+                )
+                totals["warnings"].append(partial_warning)
+            all_warnings.extend(totals["warnings"])
+            totals["duration_seconds"] = round(totals["duration_seconds"], 2)
+            step_results.append(StepResult(df=output_columns, **totals))
+
+        duration = time.time() - start_time
+        return PipelineRunResult(
+            df=output_columns,
+            steps_results=step_results,
+            total_rows_before=total_rows_before,
+            total_rows_after=total_rows_after,
+            total_rows_removed=total_rows_before - total_rows_after,
+            pipeline_stats={
+                "steps_executed": len(step_results),
+                "steps_skipped": sum(1 for r in step_results if r.metadata.get("skipped")),
+                "steps_partial": sum(1 for r in step_results if r.metadata.get("partial")),
+                "chunks": num_chunks,
+                "output_path": output_path,
+            },
+            warnings=all_warnings,
+            duration_seconds=round(duration, 2),
+        )
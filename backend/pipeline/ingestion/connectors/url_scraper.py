@@ -1,6 +1,6 @@
 """URL connector — download files and scrape web pages."""
 
-import json
+import io
 import logging
 import os
 import tempfile
@@ -10,6 +10,7 @@ from typing import Optional
 from urllib.parse import urlparse
 
 import httpx
+import orjson
 from bs4 import BeautifulSoup
 
 from app.core.minio_client import upload_file as minio_upload
@@ -20,6 +21,36 @@ logger = logging.getLogger(__name__)
 FILE_EXTENSIONS = {".csv", ".json", ".jsonl", ".parquet", ".xlsx", ".xls", ".pdf", ".docx", ".txt", ".md", ".zip", ".gz", ".tar"}
 
 
+class _JsonlStream(io.RawIOBase):
+    """Readable stream that serializes records to JSONL lazily.
+
+    Lets MinIO pull the upload in parts instead of holding the whole
+    document in memory.
+    """
+
+    def __init__(self, records: list[dict]):
+        self._it = iter(records)
+        # Mutable so appending records and dropping the consumed prefix don't
+        # recopy the whole (up to part-size) buffer on every call
+        self._buf = bytearray()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        buf = self._buf
+        while len(buf) < len(b):
+            try:
+                buf += orjson.dumps(next(self._it))
+            except StopIteration:
+                break
+            buf += b"\n"
+        n = min(len(b), len(buf))
+        b[:n] = buf[:n]
+        del buf[:n]
+        return n
+
+
 def is_direct_file(url: str, content_type: Optional[str] = None) -> bool:
     """Detect whether a URL points to a downloadable file."""
     parsed = urlparse(url)
@@ -31,43 +62,52 @@ def is_direct_file(url: str, content_type: Optional[str] = None) -> bool:
     return False
 
 
-async def download_file_from_url(url: str, minio_bucket: str = "dataforge-raw") -> dict:
-    """Download a file from a URL and upload to MinIO.
+def _store_download(url: str, content: bytes, content_type: str, minio_bucket: str) -> dict:
+    """Upload a downloaded response body to MinIO.
 
     Returns: {minio_key, filename, size, content_type}
     """
-    async with httpx.AsyncClient(follow_redirects=True, timeout=120.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
+    parsed = urlparse(url)
+    filename = os.path.basename(parsed.path) or "downloaded_file"
+    size = len(content)
+    minio_key = f"url-import/{filename}"
 
-        content_type = response.headers.get("content-type", "application/octet-stream")
-        parsed = urlparse(url)
-        filename = os.path.basename(parsed.path) or "downloaded_file"
+    minio_upload(minio_bucket, minio_key, BytesIO(content), length=size, content_type=content_type)
 
-        data = BytesIO(response.content)
-        size = len(response.content)
-        minio_key = f"url-import/{filename}"
+    return {
+        "minio_key": minio_key,
+        "filename": filename,
+        "size": size,
+        "content_type": content_type,
+    }
 
-        minio_upload(minio_bucket, minio_key, data, length=size, content_type=content_type)
 
-        return {
-            "minio_key": minio_key,
-            "filename": filename,
-            "size": size,
-            "content_type": content_type,
-        }
+async def download_file_from_url(
+    url: str,
+    minio_bucket: str = "dataforge-raw",
+    client: Optional[httpx.AsyncClient] = None,
+) -> dict:
+    """Download a file from a URL and upload to MinIO.
+
+    Returns: {minio_key, filename, size, content_type}
+    """
+    if client is None:
+        async with httpx.AsyncClient(follow_redirects=True, timeout=120.0) as own_client:
+            return await download_file_from_url(url, minio_bucket, client=own_client)
 
+    response = await client.get(url)
+    response.raise_for_status()
 
-async def scrape_url(url: str) -> dict:
-    """Scrape a web page and extract main content.
+    content_type = response.headers.get("content-type", "application/octet-stream")
+    return _store_download(url, response.content, content_type, minio_bucket)
+
+
+def _parse_html_body(html: str, url: str) -> dict:
+    """Extract title and main content from an HTML document.
 
     Returns: {url, title, content, scraped_at}
     """
-    async with httpx.AsyncClient(follow_redirects=True, timeout=60.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-
-    soup = BeautifulSoup(response.text, "lxml")
+    soup = BeautifulSoup(html, "lxml")
 
     # Remove non-content elements
     for tag in soup(["script", "style", "nav", "footer", "header", "aside", "iframe"]):
@@ -87,6 +127,42 @@ async def scrape_url(url: str) -> dict:
     }
 
 
+async def scrape_url(url: str, client: Optional[httpx.AsyncClient] = None) -> dict:
+    """Scrape a web page and extract main content.
+
+    Returns: {url, title, content, scraped_at}
+    """
+    if client is None:
+        async with httpx.AsyncClient(follow_redirects=True, timeout=60.0) as own_client:
+            return await scrape_url(url, client=own_client)
+
+    response = await client.get(url)
+    response.raise_for_status()
+    return _parse_html_body(response.text, url)
+
+
+async def _auto_fetch(url: str, client: httpx.AsyncClient, minio_bucket: str) -> tuple[Optional[dict], Optional[dict]]:
+    """Download or scrape a URL with at most one request.
+
+    The extension is checked first (no network needed). Otherwise a single
+    streaming GET is issued and the content-type decides whether the body is
+    stored as a file or parsed as HTML.
+
+    Returns: (download_result, scraped_record) — exactly one is set.
+    """
+    if is_direct_file(url):
+        return await download_file_from_url(url, minio_bucket, client=client), None
+
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        ct = response.headers.get("content-type", "")
+        body = await response.aread()
+        if is_direct_file(url, ct):
+            return _store_download(url, body, ct or "application/octet-stream", minio_bucket), None
+        html = body.decode(response.encoding or "utf-8", errors="replace")
+        return None, _parse_html_body(html, url)
+
+
 async def scrape_urls(
     urls: list[str],
     scrape_mode: str = "auto",
@@ -105,37 +181,32 @@ async def scrape_urls(
     downloaded_keys: list[str] = []
     errors: list[str] = []
 
-    for url in urls:
-        try:
-            if scrape_mode == "download":
-                result = await download_file_from_url(url, minio_bucket)
-                downloaded_keys.append(result["minio_key"])
-            elif scrape_mode == "scrape":
-                record = await scrape_url(url)
-                records.append(record)
-            else:
-                # Auto-detect
-                async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-                    head_resp = await client.head(url)
-                    ct = head_resp.headers.get("content-type", "")
-
-                if is_direct_file(url, ct):
-                    result = await download_file_from_url(url, minio_bucket)
+    async with httpx.AsyncClient(follow_redirects=True, timeout=120.0) as client:
+        for url in urls:
+            try:
+                if scrape_mode == "download":
+                    result = await download_file_from_url(url, minio_bucket, client=client)
                     downloaded_keys.append(result["minio_key"])
-                else:
-                    record = await scrape_url(url)
+                elif scrape_mode == "scrape":
+                    record = await scrape_url(url, client=client)
                     records.append(record)
-        except Exception as exc:
-            logger.error("Failed to process URL %s: %s", url, exc)
-            errors.append(f"{url}: {exc}")
+                else:
+                    # Auto-detect
+                    result, record = await _auto_fetch(url, client, minio_bucket)
+                    if result:
+                        downloaded_keys.append(result["minio_key"])
+                    else:
+                        records.append(record)
+            except Exception as exc:
+                logger.error("Failed to process URL %s: %s", url, exc)
+                errors.append(f"{url}: {exc}")
 
     # Save scraped records as JSONL
     minio_key = None
     if records:
-        jsonl = "\n".join(json.dumps(r, ensure_ascii=False) for r in records)
-        data = BytesIO(jsonl.encode("utf-8"))
         minio_key = f"url-import/scraped_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.jsonl"
-        minio_upload(minio_bucket, minio_key, data, length=len(jsonl.encode("utf-8")), content_type="application/jsonl")
+        # Unknown length → MinIO streams it as a multipart upload
+        minio_upload(minio_bucket, minio_key, _JsonlStream(records), length=-1, content_type="application/jsonl")
 
     return {
         "minio_key": minio_key or (downloaded_keys[0] if downloaded_keys else None),
@@ -14,10 +14,10 @@ class DataAugmentorStep(PipelineStep):
 
     def run(self, df: pd.DataFrame, config: dict) -> StepResult:
         if df.empty:
-            return StepResult(df.copy(), 0, 0, 0, {}, [])
+            return StepResult(df, 0, 0, 0, {}, [])
 
-        df_out = df.copy()
-        rows_before = len(df_out)
+        # The step is currently a no-op, so hand the input straight back.
+        rows_before = len(df)
         warnings = []
         
         # strategy = config.get("strategy", "generate_similar")
@@ -39,9 +39,9 @@ class DataAugmentorStep(PipelineStep):
         }
 
         return StepResult(
-            df=df_out,
+            df=df,
             rows_before=rows_before,
-            rows_after=len(df_out),
+            rows_after=rows_before,
             rows_removed=0,
             metadata=stats,
             warnings=warnings
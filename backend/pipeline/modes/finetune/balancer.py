@@ -18,9 +18,11 @@ class CategoryBalancerStep(PipelineStep):
 
     def run(self, df: pd.DataFrame, config: dict) -> StepResult:
         if df.empty:
-            return StepResult(df.copy(), 0, 0, 0, {}, [])
+            return StepResult(df, 0, 0, 0, {}, [])
 
-        df_out = df.copy()
+        # Every balancing path below rebuilds the frame via concat/sample, so
+        # the input is never mutated and a defensive copy is unnecessary.
+        df_out = df
         rows_before = len(df_out)
         warnings = []
         
@@ -70,7 +72,7 @@ class CategoryBalancerStep(PipelineStep):
                        dfs.append(group.sample(n=target_count, random_state=42))
                   else:
                        dfs.append(group)
-             df_out = pd.concat(dfs).reset_index(drop=True)
+             df_out = pd.concat(dfs).sample(frac=1.0, random_state=42).reset_index(drop=True) # Shuffle
 
         elif method == "oversample":
              # Target is the majority class, or min_per_cat
@@ -80,17 +82,24 @@ class CategoryBalancerStep(PipelineStep):
              if max_per_cat and target_count > max_per_cat:
                   target_count = max_per_cat
                   
-             dfs = []
-             for cat, group in df_out.groupby(target_col):
-                  curr_len = len(group)
-                  if curr_len < target_count:
+             # Build the positional index for every class first and
+             # materialize the frame once; the final shuffle is folded in.
+             codes, uniques = pd.factorize(df_out[target_col].values)
+             rng = np.random.default_rng(42)
+             parts = []
+             for k in range(len(uniques)):
+                  idx = np.flatnonzero(codes == k)
+                  if len(idx) < target_count:
                        # Oversample with replacement
-                       needed = target_count - curr_len
-                       sampled = group.sample(n=needed, replace=True, random_state=42)
-                       dfs.append(pd.concat([group, sampled]))
+                       extra = rng.choice(idx, size=target_count - len(idx), replace=True)
+                       parts.append(np.concatenate([idx, extra]))
+                  elif len(idx) > target_count:
+                       parts.append(rng.choice(idx, size=target_count, replace=False))
                   else:
-                       dfs.append(group.sample(n=target_count, random_state=42) if curr_len > target_count else group)
-             df_out = pd.concat(dfs).reset_index(drop=True)
+                       parts.append(idx)
+             all_idx = np.concatenate(parts)
+             rng.shuffle(all_idx)
+             df_out = df_out.iloc[all_idx].reset_index(drop=True)
              
         elif method == "augment":
              # In a real pipeline, we'd invoke the SemanticDataGenerator here asynchronously per class.
@@ -100,14 +109,14 @@ class CategoryBalancerStep(PipelineStep):
              return self.run(df, {**config, "method": "oversample"})
 
         # 4. Final Stats
-        df_out = df_out.sample(frac=1.0, random_state=42).reset_index(drop=True) # Shuffle
         dist_after = df_out[target_col].value_counts().to_dict()
+        rows_after = len(df_out)
 
         return StepResult(
             df=df_out,
             rows_before=rows_before,
-            rows_after=len(df_out),
-            rows_removed=rows_before - len(df_out),
+            rows_after=rows_after,
+            rows_removed=rows_before - rows_after,
             metadata={
                 "category_column": target_col,
                 "distribution_before": dist_before,
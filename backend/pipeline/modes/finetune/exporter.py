@@ -2,12 +2,26 @@
 
 import json
 import logging
+import orjson
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
 class FinetuneExporter:
     """Writes train/val splits to exact target formats like JSONL for Llama 3."""
+
+    def __init__(self):
+        # Pick the writer per output format once; each writer knows the value
+        # type the formatter produced for that format.
+        self._writers = {
+            "alpaca": self._write_array,
+            "sharegpt": self._write_array,
+            "openai": self._write_jsonl_objects,
+            "llama3": self._write_jsonl_text,
+            "llama2": self._write_jsonl_text,
+            "mistral": self._write_jsonl_text,
+            "gemma": self._write_jsonl_text,
+        }
     
     def export(self, df: pd.DataFrame, output_format: str, output_path: str) -> str:
         if df.empty:
@@ -15,28 +29,47 @@ class FinetuneExporter:
             return output_path
             
         # The `formatted_text` column holds the precise dictionaries or strings
-        format_col = "formatted_text" if "formatted_text" in df.columns else df.columns[0]
-        
-        is_json_obj = output_format in ("alpaca", "sharegpt")
-        
-        if is_json_obj:
-            # Dump array of JSON objects
-            records = df[format_col].tolist()
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(records, f, indent=2, ensure_ascii=False)
-        else:
-            # Dump JSONL
-            with open(output_path, "w", encoding="utf-8") as f:
-                for val in df[format_col]:
-                    if isinstance(val, dict):
-                         f.write(json.dumps(val, ensure_ascii=False) + "\n")
-                    else:
-                         # For Llama tags that are plain text, we still generally wrap it in a JSON structure 
-                         # for tools like Unsloth, OR write raw text files. standard format is usually `{"text": "<llama tokens>"}`
-                         f.write(json.dumps({"text": str(val)}, ensure_ascii=False) + "\n")
-                         
+        if "formatted_text" not in df.columns:
+            raise ValueError("Export requires a 'formatted_text' column; run FinetuneFormatterStep first.")
+
+        writer = self._writers.get(output_format, self._write_jsonl_mixed)
+        writer(df["formatted_text"], output_path)
         return output_path
 
+    def _write_array(self, values: pd.Series, output_path: str) -> None:
+        """Dump a JSON array of objects (alpaca / sharegpt)."""
+        with open(output_path, "wb") as f:
+            f.write(orjson.dumps(values.to_numpy().tolist(), option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+    def _write_jsonl_objects(self, values: pd.Series, output_path: str) -> None:
+        """Dump JSONL where every value is already a dict (openai messages)."""
+        dumps, opt = orjson.dumps, orjson.OPT_NON_STR_KEYS
+        self._write_lines([dumps(val, option=opt) for val in values], output_path)
+
+    def _write_jsonl_text(self, values: pd.Series, output_path: str) -> None:
+        """Dump JSONL for plain-text chat templates.
+
+        Llama-style tagged strings are wrapped as {"text": ...}, the usual
+        shape expected by tools like Unsloth.
+        """
+        dumps = orjson.dumps
+        self._write_lines([dumps({"text": str(val)}) for val in values], output_path)
+
+    def _write_jsonl_mixed(self, values: pd.Series, output_path: str) -> None:
+        """Dump JSONL for unknown formats, deciding dict vs text per value."""
+        dumps, opt = orjson.dumps, orjson.OPT_NON_STR_KEYS
+        self._write_lines(
+            [dumps(val if isinstance(val, dict) else {"text": str(val)}, option=opt) for val in values],
+            output_path,
+        )
+
+    @staticmethod
+    def _write_lines(chunks: list[bytes], output_path: str) -> None:
+        # One buffered write instead of a write() call per line
+        with open(output_path, "wb", buffering=1 << 20) as f:
+            f.write(b"\n".join(chunks))
+            f.write(b"\n")
+
     def generate_config(self, num_examples: int, avg_tokens: float, dataset_format: str, output_path: str) -> str:
         """Generates the recommended training script configs (e.g., Unsloth/Axolotl)."""
         
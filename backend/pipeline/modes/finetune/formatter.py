@@ -3,7 +3,11 @@
 import ast
 import json
 import logging
+import os
+from collections import OrderedDict
+from functools import lru_cache
 import tiktoken
+import numpy as np
 import pandas as pd
 from typing import Any, Dict
 
@@ -11,13 +15,69 @@ from pipeline.common.base import PipelineStep, StepResult
 
 logger = logging.getLogger(__name__)
 
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    # Arrow-backed strings: contiguous UTF-8 buffers and compiled .str kernels
+    TEXT_DTYPE = "string[pyarrow]"
+except ImportError:
+    pa = None
+    TEXT_DTYPE = str
+
+try:
+    import xxhash
+    # xxh3 hashes long formatted texts several times faster than str's SipHash
+    _text_key = xxhash.xxh3_64_intdigest
+except ImportError:  # optional: xxhash (see requirements-optional.txt)
+    _text_key = hash
+
+# Standard columns written by _normalize_input
+NORM_COLUMNS = ("_norm_instruction", "_norm_input", "_norm_output")
+
+TOKEN_BUCKET_EDGES = [0, 513, 1025, 2049, 4097, np.inf]
+TOKEN_BUCKET_LABELS = ["0-512", "512-1024", "1024-2048", "2048-4096", "4096+"]
+
+# Upper bound on cached token counts per encoding (LRU-evicted beyond this)
+TOKEN_CACHE_MAX_ENTRIES = 100_000
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(name: str) -> tiktoken.Encoding:
+    """Build a tiktoken Encoding once per name; construction parses the BPE ranks."""
+    return tiktoken.get_encoding(name)
+
+
+def _concat_text(*parts: Any) -> pd.Series:
+    """Element-wise concatenation of aligned text Series and string literals.
+
+    Arrow-backed columns are joined in a single binary_join_element_wise pass
+    instead of materializing an intermediate array for every `+`.
+    """
+    series = [p for p in parts if isinstance(p, pd.Series)]
+    if pa is not None and all(isinstance(p.dtype, pd.StringDtype) and p.dtype.storage == "pyarrow" for p in series):
+        arrays = [p.array.__arrow_array__() if isinstance(p, pd.Series) else p for p in parts]
+        arrow_type = next(a.type for a in arrays if not isinstance(a, str))
+        args = [pa.scalar(a, arrow_type) if isinstance(a, str) else a for a in arrays]
+        joined = pc.binary_join_element_wise(*args, pa.scalar("", arrow_type))
+        return pd.Series(pd.arrays.ArrowStringArray(joined), index=series[0].index)
+    result = parts[0]
+    for part in parts[1:]:
+        result = result + part
+    return result
+
+
 class FinetuneFormatterStep(PipelineStep):
     """Normalizes input instructions into specific LLM chat template formats."""
     name = "finetune_formatter"
     description = "Normalizes formats to target LLM prompts (e.g. Llama 3) and filters by token limits."
 
+    def __init__(self):
+        # encoding name -> {_text_key(formatted text): token count}; purely a cache, results never depend on it
+        self._tok_cache: dict[str, OrderedDict[int, int]] = {}
+
     def run(self, df: pd.DataFrame, config: dict) -> StepResult:
-        df_out = df.copy()
+        df_out = df.copy(deep=False) # Shallow: the step only appends columns and filters rows
         rows_before = len(df_out)
         warnings = []
         
@@ -26,6 +86,8 @@ class FinetuneFormatterStep(PipelineStep):
         sys_prompt = config.get("system_prompt", "")
         max_tokens = config.get("max_tokens_per_example", 4096)
         tokenizer_name = config.get("tokenizer", "cl100k_base")
+        exact_counts = config.get("exact_token_counts", False)
+        keep_normalized = config.get("keep_normalized", False)
         
         inst_col = config.get("instruction_column", "auto")
         in_col =   config.get("input_column", "auto")
@@ -37,52 +99,70 @@ class FinetuneFormatterStep(PipelineStep):
         if warn: warnings.append(warn)
 
         # 2. Format to Target
-        df_out["formatted_text"] = df_out.apply(
-            lambda row: self._format_row(
-                row.get("_norm_instruction", ""), 
-                row.get("_norm_input", ""), 
-                row.get("_norm_output", ""), 
-                out_format, 
-                sys_prompt
-            ), axis=1
+        df_out["formatted_text"] = self._format_column(
+            df_out["_norm_instruction"],
+            df_out["_norm_input"],
+            df_out["_norm_output"],
+            out_format,
+            sys_prompt
         )
         
         # 3. Tokenize and Filter
         try:
-             enc = tiktoken.get_encoding(tokenizer_name)
+             enc = _get_encoding(tokenizer_name)
         except Exception:
              warnings.append(f"Tokenizer {tokenizer_name} not found, falling back to cl100k_base.")
-             enc = tiktoken.get_encoding("cl100k_base")
+             enc = _get_encoding("cl100k_base")
              
-        df_out["token_count"] = df_out["formatted_text"].apply(lambda x: len(enc.encode(x if isinstance(x, str) else json.dumps(x))))
+        texts = [v if isinstance(v, str) else json.dumps(v, ensure_ascii=False) for v in df_out["formatted_text"]]
+
+        # Byte-level BPE never yields more tokens than UTF-8 bytes, so a row whose
+        # byte length is within the limit is kept regardless of its exact count.
+        # Those rows get a ~4 bytes/token estimate; only the rest are tokenized.
+        byte_len = np.fromiter(map(len, map(str.encode, texts)), dtype=np.int64, count=len(texts))
+        unbounded = max_tokens is None or max_tokens <= 0
+        if exact_counts:
+             needs_exact = np.ones(len(texts), dtype=bool)
+        elif unbounded:
+             needs_exact = np.zeros(len(texts), dtype=bool)
+        else:
+             needs_exact = byte_len > max_tokens
+
+        token_count = np.maximum(1, byte_len // 4).astype(np.int32)
+        exact_idx = np.flatnonzero(needs_exact)
+        if len(exact_idx):
+             token_count[exact_idx] = self._count_tokens(enc, [texts[i] for i in exact_idx])
+        df_out["token_count"] = token_count
         
-        filtered_df = df_out[df_out["token_count"] <= max_tokens].copy()
+        # No .copy(): the keep_cols selection below already yields a new frame
+        filtered_df = df_out if unbounded else df_out[token_count <= max_tokens]
         filtered_out_count = len(df_out) - len(filtered_df)
         
         # Calculate stats
         tc = filtered_df["token_count"]
+        # Integer counts, so [0, 513) is "<= 512" etc. — one pass, no temporary masks
+        token_hist, _ = np.histogram(tc.to_numpy(), bins=TOKEN_BUCKET_EDGES)
         stats = {
             "input_format_detected": detected_format,
             "output_format": out_format,
             "examples_formatted": len(filtered_df),
             "examples_filtered_token_limit": filtered_out_count,
+            "token_counts_estimated": int(len(texts) - len(exact_idx)),
             "avg_token_count": float(tc.mean()) if not tc.empty else 0.0,
             "max_token_count": int(tc.max()) if not tc.empty else 0,
             "min_token_count": int(tc.min()) if not tc.empty else 0,
-             "token_distribution": {
-                "0-512": int((tc <= 512).sum()),
-                "512-1024": int(((tc > 512) & (tc <= 1024)).sum()),
-                "1024-2048": int(((tc > 1024) & (tc <= 2048)).sum()),
-                "2048-4096": int(((tc > 2048) & (tc <= 4096)).sum()),
-                "4096+": int((tc > 4096).sum())
-            }
+             "token_distribution": dict(zip(TOKEN_BUCKET_LABELS, (int(c) for c in token_hist)))
         }
 
-        # Cleanup internal columns, keeping only target formatted output and tokens
+        # Cleanup internal columns, keeping only target formatted output and tokens.
+        # With keep_normalized the Arrow-backed _norm_* columns stay too, so later
+        # steps read them as-is instead of normalizing again.
         keep_cols = ["formatted_text", "token_count"]
+        if keep_normalized:
+            keep_cols.extend(NORM_COLUMNS)
         # Retain other original data if needed, but for export we usually just dump `formatted_text`
         for col in df_out.columns:
-            if col not in ["_norm_instruction", "_norm_input", "_norm_output", "formatted_text", "token_count"]:
+            if col not in NORM_COLUMNS and col not in ("formatted_text", "token_count"):
                 keep_cols.append(col)
                 
         filtered_df = filtered_df[keep_cols]
@@ -96,8 +176,36 @@ class FinetuneFormatterStep(PipelineStep):
             warnings=warnings
         )
         
+    def _count_tokens(self, enc: tiktoken.Encoding, texts: list[str]) -> list[int]:
+        """Exact token counts for `texts`, encoding each distinct text at most once.
+
+        Counts are cached by content hash, so repeated rows (shared system
+        prompts, short canned answers) and texts seen in an earlier run of
+        this step cost a dict lookup instead of a BPE pass.
+        """
+        cache = self._tok_cache.setdefault(enc.name, OrderedDict())
+        keys = list(map(_text_key, texts))
+        misses: dict[int, str] = {}
+        for key, text in zip(keys, texts):
+            if key in cache:
+                cache.move_to_end(key)
+            elif key not in misses:
+                misses[key] = text
+        if misses:
+             # Batch-encode so tiktoken tokenizes across threads in Rust instead of one Python call per row.
+             # encode_ordinary skips the per-text special-token scan, and user text that happens to
+             # contain e.g. "<|endoftext|>" is counted as plain text instead of raising.
+             token_ids = enc.encode_ordinary_batch(list(misses.values()), num_threads=os.cpu_count() or 1)
+             cache.update(zip(misses, map(len, token_ids)))
+        counts = [cache[key] for key in keys]
+        while len(cache) > TOKEN_CACHE_MAX_ENTRIES:
+             cache.popitem(last=False)
+        return counts
+
     def _normalize_input(self, df: pd.DataFrame, in_format: str, inst_col: str, in_col: str, out_col: str) -> tuple[pd.DataFrame, str, str]:
-        cols = [c.lower() for c in df.columns]
+        # Lower-cased name -> original name, built once and shared by detection and mapping
+        col_map = {c.lower(): c for c in df.columns}
+        cols = col_map.keys()
         actual_format = in_format
         warning = ""
 
@@ -122,10 +230,11 @@ class FinetuneFormatterStep(PipelineStep):
         # Mapping logic
         if actual_format == "sharegpt":
             msg_col = "messages" if "messages" in df.columns else "conversations" if "conversations" in df.columns else df.columns[0]
+            literal_eval = ast.literal_eval
             def extract_sharegpt(val):
                 try:
                      # Parse stringified lists
-                     if isinstance(val, str): val = ast.literal_eval(val)
+                     if isinstance(val, str): val = literal_eval(val)
                      if not isinstance(val, list) or len(val) < 2: return "", "", ""
                      # Simple mapping: first user gives instruction, first assistant gives output
                      instruction = next((m.get("content", m.get("value", "")) for m in val if m.get("role") == "user" or m.get("from") == "human"), "")
@@ -133,19 +242,21 @@ class FinetuneFormatterStep(PipelineStep):
                      return instruction, "", output
                 except Exception:
                      return "", "", ""
-            extracted = df[msg_col].apply(extract_sharegpt)
-            df["_norm_instruction"] = extracted.apply(lambda x: x[0])
-            df["_norm_input"] = extracted.apply(lambda x: x[1])
-            df["_norm_output"] = extracted.apply(lambda x: x[2])
+            # Single pass over the column, collecting the three fields directly
+            instructions, inputs, outputs = [], [], []
+            for v in df[msg_col].to_numpy():
+                i, n, o = extract_sharegpt(v)
+                instructions.append(i); inputs.append(n); outputs.append(o)
+            df["_norm_instruction"] = instructions
+            df["_norm_input"] = inputs
+            df["_norm_output"] = outputs
 
         elif actual_format == "alpaca":
-            col_map = {c.lower(): c for c in df.columns}
             df["_norm_instruction"] = df[col_map.get("instruction", df.columns[0])] if "instruction" in col_map else ""
             df["_norm_input"] = df[col_map.get("input", "")] if "input" in col_map else ""
             df["_norm_output"] = df[col_map.get("output", df.columns[-1])] if "output" in col_map else ""
             
         elif actual_format == "qa_pairs":
-            col_map = {c.lower(): c for c in df.columns}
             q_col = col_map.get("question", col_map.get("q", df.columns[0]))
             a_col = col_map.get("answer", col_map.get("a", df.columns[-1]))
             df["_norm_instruction"] = df[q_col]
@@ -153,7 +264,6 @@ class FinetuneFormatterStep(PipelineStep):
             df["_norm_output"] = df[a_col]
             
         elif actual_format == "raw_pairs":
-            col_map = {c.lower(): c for c in df.columns}
             p_col = col_map.get("prompt", df.columns[0])
             c_col = col_map.get("completion", df.columns[1] if len(df.columns) > 1 else df.columns[0])
             df["_norm_instruction"] = df[p_col]
@@ -165,44 +275,53 @@ class FinetuneFormatterStep(PipelineStep):
              df["_norm_input"] = df[in_col] if in_col in df.columns else ""
              df["_norm_output"] = df[out_col] if out_col in df.columns else ""
 
-        # Fill NaNs
-        df["_norm_instruction"] = df["_norm_instruction"].fillna("").astype(str)
-        df["_norm_input"] = df["_norm_input"].fillna("").astype(str)
-        df["_norm_output"] = df["_norm_output"].fillna("").astype(str)
+        # Fill NaNs in one pass over the three-column slice
+        norm_cols = list(NORM_COLUMNS)
+        df[norm_cols] = df[norm_cols].fillna("").astype(TEXT_DTYPE, copy=False)
         
         return df, actual_format, warning
 
-    def _format_row(self, inst: str, inp: str, out: str, target_format: str, sys_prompt: str) -> Any:
-        full_inst = f"{inst}\n{inp}".strip() if inp else inst
+    def _format_column(self, inst: pd.Series, inp: pd.Series, out: pd.Series, target_format: str, sys_prompt: str) -> Any:
+        """Apply the target chat template to whole columns, dispatching on the format once.
+
+        String templates keep the dtype of the normalized columns, so they stay
+        Arrow-backed when pyarrow is available.
+        """
+        full_inst = inst.where(inp.str.len() == 0, _concat_text(inst, "\n", inp).str.strip())
 
         if target_format == "llama3":
             sys_block = f"<|start_header_id|>system<|end_header_id|>\n{sys_prompt}<|eot_id|>" if sys_prompt else ""
-            return f"<|begin_of_text|>{sys_block}<|start_header_id|>user<|end_header_id|>\n{full_inst}<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n{out}<|eot_id|>"
-            
+            return _concat_text(f"<|begin_of_text|>{sys_block}<|start_header_id|>user<|end_header_id|>\n", full_inst,
+                                "<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n", out, "<|eot_id|>")
+
         elif target_format == "llama2":
             sys_block = f"<<SYS>>{sys_prompt}<</SYS>> " if sys_prompt else ""
-            return f"<s>[INST] {sys_block}{full_inst} [/INST] {out} </s>"
-            
+            return _concat_text(f"<s>[INST] {sys_block}", full_inst, " [/INST] ", out, " </s>")
+
         elif target_format == "mistral":
-             # Mistral doesn't natively use a system prompt in its standard chat template as strongly, 
+             # Mistral doesn't natively use a system prompt in its standard chat template as strongly,
              # but often it's prepended to the instruction
-             inst_with_sys = f"{sys_prompt}\n\n{full_inst}".strip() if sys_prompt else full_inst
-             return f"<s>[INST] {inst_with_sys} [/INST] {out}</s>"
-             
+             inst_with_sys = (f"{sys_prompt}\n\n" + full_inst).str.strip() if sys_prompt else full_inst
+             return _concat_text("<s>[INST] ", inst_with_sys, " [/INST] ", out, "</s>")
+
         elif target_format == "gemma":
              sys_block = f"<start_of_turn>user\n{sys_prompt}\n\n" if sys_prompt else "<start_of_turn>user\n"
-             return f"{sys_block}{full_inst}<end_of_turn>\n<start_of_turn>model\n{out}<end_of_turn>"
-             
+             return _concat_text(sys_block, full_inst, "<end_of_turn>\n<start_of_turn>model\n", out, "<end_of_turn>")
+
+        # Dict-returning formats: zip the underlying arrays rather than building a Series per row
         elif target_format == "alpaca":
-             # Return a dict, exporter will handle jsonl dumping
-             return {"instruction": inst, "input": inp, "output": out}
-             
+             return [{"instruction": i, "input": n, "output": o}
+                     for i, n, o in zip(inst.to_numpy(), inp.to_numpy(), out.to_numpy())]
+
         elif target_format == "sharegpt":
-             return {"conversations": [{"from": "human", "value": full_inst}, {"from": "gpt", "value": out}]}
-             
+             return [{"conversations": [{"from": "human", "value": fi}, {"from": "gpt", "value": o}]}
+                     for fi, o in zip(full_inst.to_numpy(), out.to_numpy())]
+
         else: # "openai" default
-             msgs = []
-             if sys_prompt: msgs.append({"role": "system", "content": sys_prompt})
-             msgs.append({"role": "user", "content": full_inst})
-             msgs.append({"role": "assistant", "content": out})
-             return {"messages": msgs}
+             # The system message is identical for every row, so build it once and share it
+             if sys_prompt:
+                  sys_msg = {"role": "system", "content": sys_prompt}
+                  return [{"messages": [sys_msg, {"role": "user", "content": fi}, {"role": "assistant", "content": o}]}
+                          for fi, o in zip(full_inst.to_numpy(), out.to_numpy())]
+             return [{"messages": [{"role": "user", "content": fi}, {"role": "assistant", "content": o}]}
+                     for fi, o in zip(full_inst.to_numpy(), out.to_numpy())]
@@ -2,16 +2,58 @@
 
 import re
 import logging
+from functools import lru_cache
+from typing import Callable
+import numpy as np
 import pandas as pd
 
 from pipeline.common.base import PipelineStep, StepResult
 
 logger = logging.getLogger(__name__)
 
+try:
+    import ahocorasick
+except ImportError:  # optional: pyahocorasick (see requirements-optional.txt)
+    ahocorasick = None
+
+
+@lru_cache(maxsize=16)
+def _build_refusal_regex(phrases: tuple[str, ...]) -> re.Pattern:
+    """Compile the combined refusal matcher once per distinct phrase list."""
+    return re.compile("|".join(re.escape(p) for p in phrases), re.IGNORECASE)
+
+
+@lru_cache(maxsize=16)
+def _build_refusal_matcher(phrases: tuple[str, ...]) -> Callable[[str], bool]:
+    """Build a "contains any phrase" test for already lower-cased text.
+
+    Uses one Aho-Corasick automaton when pyahocorasick is installed, otherwise
+    a case-sensitive alternation over the lower-cased phrases; both avoid re's
+    IGNORECASE matching, which is an order of magnitude slower on long text.
+    """
+    lowered = [p.lower() for p in phrases]
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for phrase in lowered:
+            automaton.add_word(phrase, phrase)
+        automaton.make_automaton()
+        return lambda text: next(automaton.iter(text), None) is not None
+    pattern = re.compile("|".join(re.escape(p) for p in lowered))
+    return lambda text: pattern.search(text) is not None
+
+
+def _as_text(s: pd.Series) -> pd.Series:
+    """Coerce to strings, keeping already-string (e.g. Arrow-backed) columns as they are."""
+    if isinstance(s.dtype, pd.StringDtype):
+        return s.fillna("")
+    return s.astype(str)
+
+
 class ResponseQualityStep(PipelineStep):
     """Filters low-quality or refusal responses."""
     name = "response_quality"
     description = "Filters low-quality, incomplete, or refusal responses from chat/instruction datasets."
+    requires_normalized = True
 
     # Default refusal phrases common in base safety layers
     DEFAULT_REFUSALS = [
@@ -21,7 +63,7 @@ class ResponseQualityStep(PipelineStep):
     ]
 
     def run(self, df: pd.DataFrame, config: dict) -> StepResult:
-        df_out = df.copy()
+        df_out = df.copy(deep=False) # Shallow: the step only appends columns and filters rows
         rows_before = len(df_out)
         warnings = []
         
@@ -30,10 +72,11 @@ class ResponseQualityStep(PipelineStep):
         min_inst_len = config.get("min_instruction_length", 3)
         check_completeness = config.get("check_response_completeness", True)
         filter_refusals = config.get("filter_refusals", True)
-        refusals = config.get("refusal_phrases", self.DEFAULT_REFUSALS)
+        # Empty phrases would match every response
+        refusals = tuple(p for p in config.get("refusal_phrases", self.DEFAULT_REFUSALS) if p)
         action = config.get("action", "filter")
 
-        # We assume FinetuneFormatterStep has run and populated _norm_instruction & _norm_output
+        # We assume FinetuneFormatterStep has run with keep_normalized and left _norm_instruction & _norm_output
         inst_col = "_norm_instruction" if "_norm_instruction" in df_out.columns else df_out.columns[0]
         out_col = "_norm_output" if "_norm_output" in df_out.columns else df_out.columns[-1]
 
@@ -42,58 +85,71 @@ class ResponseQualityStep(PipelineStep):
              warnings.append(f"Could not find instruction/output columns ({inst_col}, {out_col}). Skipping Response Quality.")
              return StepResult(df_out, rows_before, rows_before, 0, {}, warnings)
 
-        refusal_pattern = re.compile("|".join([re.escape(r) for r in refusals]), re.IGNORECASE)
-        
-        def evaluate_row(row):
-            inst = str(row.get(inst_col, ""))
-            out = str(row.get(out_col, ""))
-            
-            inst_words = len(inst.split())
-            out_words = len(out.split())
-            
-            score = 10.0
-            reasons = []
-            
-            # 1. Length penalties
-            if inst_words < min_inst_len:
-                 score -= 5.0
-                 reasons.append("instruction_too_short")
-            if out_words < min_resp_len:
-                 score -= 5.0
-                 reasons.append("response_too_short")
-            if out_words > max_resp_len:
-                 score -= 2.0
-                 reasons.append("response_too_long")
-                 
-            # 2. Refusals
-            if filter_refusals and refusal_pattern.search(out):
-                 score -= 8.0 # Heavy penalty
-                 reasons.append("refusal_detected")
-                 
-            # 3. Completeness (heuristic: ends with punctuation)
-            if check_completeness and out:
-                 out_clean = out.strip()
-                 if not out_clean[-1] in ".!?\"'”’]}>":
-                      # Might be cut off
-                      score -= 3.0
-                      reasons.append("incomplete_response")
-
-            return pd.Series([max(0.0, score), ",".join(reasons)])
-
-        res = df_out.apply(evaluate_row, axis=1)
-        df_out["_response_quality_score"] = res[0]
-        df_out["_response_quality_reasons"] = res[1]
+        inst_s = _as_text(df_out[inst_col])
+        out_s = _as_text(df_out[out_col])
+        # Count non-whitespace runs with the compiled regex engine instead of
+        # materializing a list of words per row via split()
+        inst_words = inst_s.str.count(r"\S+").to_numpy()
+        out_words = out_s.str.count(r"\S+").to_numpy()
+
+        score = np.full(len(df_out), 10.0)
+
+        # 1. Length penalties
+        too_short_inst = inst_words < min_inst_len
+        too_short_out = out_words < min_resp_len
+        too_long_out = out_words > max_resp_len
+        score -= 5.0 * too_short_inst
+        score -= 5.0 * too_short_out
+        score -= 2.0 * too_long_out
+
+        # 2. Refusals
+        if filter_refusals and refusals:
+             if isinstance(out_s.dtype, pd.StringDtype):
+                  # Arrow's regex kernel (RE2) takes the pattern source, not a compiled re.Pattern
+                  pattern = _build_refusal_regex(refusals).pattern
+                  refused = out_s.str.contains(pattern, case=False, regex=True).to_numpy(dtype=bool)
+             else:
+                  matches = _build_refusal_matcher(refusals)
+                  refused = np.fromiter((matches(t.lower()) for t in out_s.tolist()), dtype=bool, count=len(out_s))
+        else:
+             refused = np.zeros(len(df_out), dtype=bool)
+        score -= 8.0 * refused # Heavy penalty
+
+        # 3. Completeness (heuristic: ends with punctuation)
+        if check_completeness:
+             last_char = out_s.str.strip().str[-1:]
+             incomplete = (out_s.str.len() > 0).to_numpy() & ~last_char.isin(list(".!?\"'”’]}>")).to_numpy()
+        else:
+             incomplete = np.zeros(len(df_out), dtype=bool)
+        score -= 3.0 * incomplete # Might be cut off
+
+        scores_np = np.maximum(score, 0.0)
 
         filtered_out = 0
         if action == "filter":
-             filtered_df = df_out[df_out["_response_quality_score"] >= 6.0].copy()
-             filtered_out = len(df_out) - len(filtered_df)
-             df_out = filtered_df
-             # Drop temp columns unless debugging
-             df_out = df_out.drop(columns=["_response_quality_score", "_response_quality_reasons"], errors='ignore')
+             # Temp columns would be dropped again right away, so select rows directly
+             keep_mask = scores_np >= 6.0
+             filtered_out = int(len(keep_mask) - keep_mask.sum())
+             df_out = df_out.iloc[keep_mask]
+             stale = [c for c in ("_response_quality_score", "_response_quality_reasons") if c in df_out.columns]
+             if stale:
+                  df_out = df_out.drop(columns=stale)
+        else:
+             df_out["_response_quality_score"] = scores_np
+             # Reasons only matter when rows (and temp columns) are kept
+             reasons = np.full(len(df_out), "", dtype=object)
+             for label, mask in (
+                  ("instruction_too_short", too_short_inst),
+                  ("response_too_short", too_short_out),
+                  ("response_too_long", too_long_out),
+                  ("refusal_detected", refused),
+                  ("incomplete_response", incomplete),
+             ):
+                  reasons = np.where(mask, np.where(reasons == "", label, reasons + "," + label), reasons)
+             df_out["_response_quality_reasons"] = reasons
 
         stats = {
-             "avg_quality_score": df["_response_quality_score"].mean() if "_response_quality_score" in df else 0.0,
+             "avg_quality_score": float(scores_np.mean()) if scores_np.size else 0.0,
              "total_filtered": filtered_out
         }
 
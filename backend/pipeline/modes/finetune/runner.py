@@ -1,6 +1,8 @@
 """Fine-tuning Pipeline Orchestrator."""
 
 import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 import pandas as pd
 from typing import Callable, Any
@@ -92,11 +94,16 @@ class FinetunePipelineRunner:
         # 2. Finetune Formatter (Always runs to convert schema)
         curr_prog += progress_per_step
         progress_callback(int(curr_prog), f"Formatting to {config.output_format} schema...")
+        # Normalize once: keep the formatter's _norm_* columns when a later step reads them
+        fine_steps = [(config.run_response_quality, ResponseQualityStep), (config.run_balancer, CategoryBalancerStep),
+                      (config.run_augmentation, DataAugmentorStep)]
+        keep_normalized = any(enabled and step_cls.requires_normalized for enabled, step_cls in fine_steps)
         fmt_step = FinetuneFormatterStep()
         fmt_res = fmt_step.run(df_curr, {
             "output_format": config.output_format,
             "system_prompt": config.system_prompt,
-            "max_tokens_per_example": config.max_tokens_per_example
+            "max_tokens_per_example": config.max_tokens_per_example,
+            "keep_normalized": keep_normalized
         })
         df_curr = fmt_res.df
         stats.append({"step": fmt_step.name, "metadata": fmt_res.metadata, "warnings": fmt_res.warnings})
@@ -111,6 +118,7 @@ class FinetunePipelineRunner:
             stats.append({"step": rq_step.name, "metadata": rq_res.metadata, "warnings": rq_res.warnings})
 
         # 4. Balancer
+        bal_res = None
         if config.run_balancer and not df_curr.empty:
             curr_prog += progress_per_step
             progress_callback(int(curr_prog), "Balancing categories...")
@@ -137,29 +145,32 @@ class FinetunePipelineRunner:
              val_df = pd.DataFrame(columns=df_curr.columns)
         else:
              stratify = None
-             if config.run_balancer and "category_column" in locals().get('bal_res', StepResult(df,0,0,0,{},[])).metadata:
-                  cat_col = bal_res.metadata.get("category_column")
+             if bal_res is not None and "category_column" in bal_res.metadata:
+                  cat_col = bal_res.metadata["category_column"]
                   if cat_col in df_curr.columns and df_curr[cat_col].nunique() > 1:
                        stratify = df_curr[cat_col]
                        
-             try:
-                 train_df, val_df = train_test_split(
-                     df_curr, 
-                     test_size=config.val_split, 
-                     train_size=config.train_split,
-                     random_state=config.seed if config.shuffle else None,
-                     shuffle=config.shuffle,
-                     stratify=stratify
-                 )
-             except ValueError:
-                 # Stratification fails if a class has only 1 member, fallback to random
-                 train_df, val_df = train_test_split(
-                     df_curr, 
-                     test_size=config.val_split, 
-                     train_size=config.train_split,
-                     random_state=config.seed if config.shuffle else None,
-                     shuffle=config.shuffle
-                 )
+             # Pre-check what train_test_split needs for stratification rather than
+             # catching its ValueError and re-running the whole split.
+             if stratify is not None:
+                  class_counts = stratify.value_counts()
+                  n_val = math.ceil(config.val_split * len(df_curr))
+                  n_train = math.floor(config.train_split * len(df_curr))
+                  if not config.shuffle:
+                       logger.warning("Stratification disabled for job %s: requires shuffle", job_id)
+                       stratify = None
+                  elif class_counts.min() < 2 or min(n_val, n_train) < len(class_counts):
+                       logger.warning("Stratification disabled for job %s: too few examples per class", job_id)
+                       stratify = None
+
+             train_df, val_df = train_test_split(
+                 df_curr, 
+                 test_size=config.val_split, 
+                 train_size=config.train_split,
+                 random_state=config.seed if config.shuffle else None,
+                 shuffle=config.shuffle,
+                 stratify=stratify
+             )
 
         # Calculate final output stats
         total = len(train_df) + len(val_df)
@@ -180,11 +191,15 @@ class FinetunePipelineRunner:
         val_path = f"/tmp/{job_id}_val.jsonl"
         cfg_path = f"/tmp/{job_id}_training_config.json"
         
-        exporter.export(train_df, config.output_format, train_path)
-        if not val_df.empty:
-             exporter.export(val_df, config.output_format, val_path)
-             
-        exporter.generate_config(total, avg_tok, config.output_format, cfg_path)
+        # The three files are independent; write them concurrently so the total
+        # export time tracks the largest file rather than the sum.
+        with ThreadPoolExecutor(max_workers=3) as pool:
+             futures = [pool.submit(exporter.export, train_df, config.output_format, train_path)]
+             if not val_df.empty:
+                  futures.append(pool.submit(exporter.export, val_df, config.output_format, val_path))
+             futures.append(pool.submit(exporter.generate_config, total, avg_tok, config.output_format, cfg_path))
+             for fut in futures:
+                  fut.result()
 
         return FinetunePipelineResult(
             train_df=train_df,
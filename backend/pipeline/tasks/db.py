@@ -0,0 +1,44 @@
+"""Synchronous database engine shared by the Celery tasks."""
+
+import logging
+from typing import Optional
+
+from celery.signals import worker_process_init
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# One engine (and connection pool) per worker process
+_engine: Optional[Engine] = None
+# Tasks read attributes after commit, so don't expire (and re-SELECT) them
+_session_factory = sessionmaker(expire_on_commit=False)
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            settings.DATABASE_URL_SYNC,
+            pool_size=5,
+            max_overflow=10,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+        )
+    return _engine
+
+
+def get_session() -> Session:
+    """Open a session on the shared engine."""
+    return _session_factory(bind=get_engine())
+
+
+@worker_process_init.connect
+def _init_worker_engine(**kwargs) -> None:
+    """Give each forked worker its own pool instead of sockets inherited from the parent."""
+    if _engine is not None:
+        _engine.dispose(close=False)
+    get_engine()
@@ -1,12 +1,17 @@
 """Celery task for fine-tune pipelines."""
 
-import asyncio
-import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
 from uuid import UUID
 
+from sqlalchemy import cast, func, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+
 from pipeline.workers.celery_app import celery_app
-from app.core.database import SessionLocal
+from pipeline.tasks.pipeline import publish_job_progress
+from pipeline.tasks.db import get_session
 from app.models.job import Job, JobStatus
 from app.core.minio_client import get_file_stream, upload_file
 from ai.insight_reporter import InsightReporter
@@ -16,41 +21,47 @@ from pipeline.modes.finetune.runner import FinetunePipelineRunner, FinetuneConfi
 
 logger = logging.getLogger(__name__)
 
-def sync_update_job(job_id: str, updates: dict):
-    with SessionLocal() as db:
-        job = db.query(Job).filter(Job.id == UUID(job_id)).first()
-        if job:
-            for k, v in updates.items():
-                if k == "config":
-                    # merge config
-                    curr = job.config or {}
-                    curr.update(v)
-                    job.config = curr
-                    from sqlalchemy.orm.attributes import flag_modified
-                    flag_modified(job, "config")
-                else:
-                    setattr(job, k, v)
-            db.commit()
+def sync_update_job_fields(job_id: str, **fields):
+    """Set plain Job columns with a single UPDATE (no SELECT, no ORM instance)."""
+    with get_session() as db:
+        db.execute(
+            update(Job).where(Job.id == UUID(job_id)).values(**fields)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+def sync_merge_job_config(job_id: str, patch: dict, **fields):
+    """Merge `patch` into Job.config inside Postgres (JSONB ||), optionally setting other columns too."""
+    merged = func.coalesce(Job.config, cast({}, JSONB)).op("||")(cast(patch, JSONB))
+    sync_update_job_fields(job_id, config=merged, **fields)
+
+def _upload_output(upload: tuple[str, str]) -> Exception | None:
+    """Stream one output file to MinIO with its real byte size; returns the error instead of raising."""
+    key, path = upload
+    try:
+        with open(path, "rb") as fh:
+            upload_file("dataforge-processed", key, fh, os.path.getsize(path))
+    except Exception as exc:
+        logger.error(f"Upload of {key} failed: {exc}")
+        return exc
+    return None
 
 @celery_app.task(bind=True, name="run_finetune_pipeline")
 def run_finetune_pipeline(self, job_id: str) -> dict:
     logger.info(f"Starting finetune job {job_id}")
-    sync_update_job(job_id, {"status": JobStatus.PROCESSING, "progress": 0})
-    
-    import redis
-    from app.core.config import settings
-    r = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    sync_update_job_fields(job_id, status=JobStatus.PROCESSING, progress=0)
     
     def report_progress(prog: int, msg: str):
         self.update_state(state="PROGRESS", meta={"progress": prog, "message": msg})
-        sync_update_job(job_id, {"progress": prog})
-        payload = json.dumps({"job_id": job_id, "progress": prog, "message": msg, "status": "processing"})
-        r.publish(f"job:{job_id}", payload)
+        sync_update_job_fields(job_id, progress=prog)
+        publish_job_progress(job_id, prog, "finetune", msg, status="processing")
 
     try:
         # Load Job
-        with SessionLocal() as db:
-            job = db.query(Job).filter(Job.id == UUID(job_id)).first()
+        with get_session() as db:
+            job = db.execute(
+                select(Job.dataset_id, Job.user_id, Job.config).where(Job.id == UUID(job_id))
+            ).first()
             if not job: raise ValueError("Job not found")
             dataset_id = str(job.dataset_id)
             user_id = str(job.user_id)
@@ -79,20 +90,21 @@ def run_finetune_pipeline(self, job_id: str) -> dict:
         val_path = result.output_files.get("val")
         cfg_path = result.output_files["config"]
         
-        upload_file("dataforge-processed", train_key, open(train_path, "rb"), len(train_df := result.train_df) if train_path else 0)
-        if val_path: upload_file("dataforge-processed", val_key, open(val_path, "rb"), len(result.val_df))
-        if cfg_path: upload_file("dataforge-processed", cfg_key, open(cfg_path, "rb"), 1000)
+        # Uploads are I/O bound, so run them side by side; every upload is
+        # attempted before the first failure is re-raised
+        uploads = [(key, path) for key, path in ((train_key, train_path), (val_key, val_path), (cfg_key, cfg_path)) if path]
+        with ThreadPoolExecutor(max_workers=len(uploads)) as ex:
+            errors = [exc for exc in ex.map(_upload_output, uploads) if exc is not None]
+        if errors: raise errors[0]
         
-        # Generate insight synchronously mapped async
-        loop = asyncio.get_event_loop()
-        reporter = InsightReporter(None) # Heuristic only for background generic
-        insight = loop.run_until_complete(reporter.generate(
+        # Heuristic-only insight: no LLM call, so no event loop is needed
+        reporter = InsightReporter(None)
+        insight = reporter.generate_sync(
             {"total_rows_before": len(df), "total_rows_after": result.total_examples, "total_rows_removed": len(df)-result.total_examples, "duration_seconds": 30},
             {"row_count": len(df)},
             "finetune"
-        ))
+        )
         
-        from dataclasses import asdict
         
         final_meta = {
              "pipeline_result": {
@@ -110,16 +122,14 @@ def run_finetune_pipeline(self, job_id: str) -> dict:
              }
         }
         
-        sync_update_job(job_id, {"status": JobStatus.COMPLETED, "progress": 100, "config": final_meta})
+        sync_merge_job_config(job_id, final_meta, status=JobStatus.COMPLETED, progress=100)
         
-        r.publish(f"job:{job_id}", json.dumps({
-            "job_id": job_id, "progress": 100, "message": "Finetuning complete!", "status": "completed"
-        }))
+        publish_job_progress(job_id, 100, "complete", "Finetuning complete!", status="completed")
         
         return {"job_id": job_id, "status": "completed"}
         
     except Exception as e:
         logger.error(f"Job failed: {e}", exc_info=True)
-        sync_update_job(job_id, {"status": JobStatus.FAILED, "error_message": str(e)})
-        r.publish(f"job:{job_id}", json.dumps({"job_id": job_id, "status": "failed", "error": str(e)}))
+        sync_update_job_fields(job_id, status=JobStatus.FAILED, error_message=str(e))
+        publish_job_progress(job_id, 0, "error", str(e), status="failed")
         raise e
@@ -1,30 +1,41 @@
 """Celery task for running the common pipeline on a dataset."""
 
+import io
 import json
 import logging
 import os
 import tempfile
 from typing import Optional
 
-import redis
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import cast, func, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
 
-from pipeline.workers.celery_app import celery_app
-from app.core.config import settings
+from pipeline.workers.celery_app import PROGRESS_STREAM_MAXLEN, celery_app, get_redis
+from pipeline.tasks.db import get_engine
+from app.core.minio_client import download_to_path, upload_file as minio_upload
+from app.models.dataset import Dataset
+from app.models.job import Job, JobStatus, ProcessedDataset
+from pipeline.common.runner import PipelineRunner
+from pipeline.ingestion.file_handler import FileHandler
 
 logger = logging.getLogger(__name__)
 
-_redis: Optional[redis.Redis] = None
+# Seconds to keep the progress stream and last-known state around after the final update
+JOB_STATE_TTL = 3600
 
+# Largest (uncompressed) Arrow table whose Parquet output is built in memory
+# rather than staged in a temp file before upload
+PARQUET_IN_MEMORY_MAX_BYTES = 512 * 1024 * 1024
 
-def get_redis() -> redis.Redis:
-    global _redis
-    if _redis is None:
-        _redis = redis.from_url(settings.REDIS_URL)
-    return _redis
+# Minimum progress delta (in percent) before the live value is written to Postgres
+PROGRESS_DB_MIN_DELTA = 5
 
 
 def publish_job_progress(job_id: str, progress: int, step: str, message: str, status: str = "running", step_result: Optional[dict] = None) -> None:
-    """Publish job progress to Redis for WebSocket delivery."""
+    """Publish job progress to a Redis stream for WebSocket delivery."""
     r = get_redis()
     payload = {
         "job_id": job_id,
@@ -35,7 +46,13 @@ def publish_job_progress(job_id: str, progress: int, step: str, message: str, st
     }
     if step_result:
         payload["step_result"] = step_result
-    r.publish(f"job:{job_id}", json.dumps(payload))
+    # Append to the replayable stream and record the last-known state in one round trip
+    pipe = r.pipeline(transaction=False)
+    pipe.xadd(f"job:{job_id}:stream", {"data": json.dumps(payload)}, maxlen=PROGRESS_STREAM_MAXLEN, approximate=True)
+    pipe.expire(f"job:{job_id}:stream", JOB_STATE_TTL)
+    pipe.hset(f"job:{job_id}:state", mapping={"progress": progress, "step": step, "status": status})
+    pipe.expire(f"job:{job_id}:state", JOB_STATE_TTL)
+    pipe.execute()
 
 
 @celery_app.task(name="run_common_pipeline", bind=True)
@@ -52,33 +69,31 @@ def run_common_pipeline(self, job_id: str) -> dict:
     7. Create ProcessedDataset record
     8. Push completion event
     """
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import Session
-    from app.models.job import Job, JobStatus, ProcessedDataset
-    from app.models.dataset import Dataset
-
-    engine = create_engine(settings.DATABASE_URL_SYNC)
+    engine = get_engine()
 
     try:
         publish_job_progress(job_id, 2, "init", "Loading job...")
 
-        # 1. Load job
+        # 1. Mark the job running and read what we need from it in one statement
         with Session(engine) as session:
-            job = session.get(Job, job_id)
+            job = session.execute(
+                update(Job).where(Job.id == job_id)
+                .values(status=JobStatus.RUNNING, progress=5)
+                .returning(Job.dataset_id, Job.workflow_steps)
+            ).first()
             if not job:
                 return {"error": "Job not found"}
-
-            job.status = JobStatus.RUNNING
-            job.progress = 5
             session.commit()
 
             dataset_id = str(job.dataset_id)
             steps_config = job.workflow_steps or []
-            session.expunge(job)
 
-        # 2. Load dataset
+        # 2. Load dataset (only the columns we use, no ORM instance)
         with Session(engine) as session:
-            dataset = session.get(Dataset, dataset_id)
+            dataset = session.execute(
+                select(Dataset.raw_file_path, Dataset.detected_format, Dataset.stats)
+                .where(Dataset.id == dataset_id)
+            ).first()
             if not dataset or not dataset.raw_file_path:
                 _fail_job(engine, job_id, "Dataset not found or has no file")
                 publish_job_progress(job_id, 0, "error", "Dataset not found", status="failed")
@@ -86,28 +101,32 @@ def run_common_pipeline(self, job_id: str) -> dict:
 
             raw_path = dataset.raw_file_path
             detected_format = dataset.detected_format or "csv"
-            session.expunge(dataset)
+            column_stats = (dataset.stats or {}).get("columns", [])
 
         publish_job_progress(job_id, 10, "loading", "Downloading dataset from storage...")
 
-        # 3. Download from MinIO
-        from app.core.minio_client import download_file, upload_file as minio_upload
+        # 3. Download from MinIO straight to a temp file
+        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{detected_format}") as tmp:
+            tmp_path = tmp.name
         try:
-            file_data = download_file("dataforge-raw", raw_path)
+            download_to_path("dataforge-raw", raw_path, tmp_path)
         except Exception as exc:
+            os.unlink(tmp_path)
             _fail_job(engine, job_id, f"Storage error: {exc}")
             publish_job_progress(job_id, 0, "error", str(exc), status="failed")
             return {"error": str(exc)}
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{detected_format}") as tmp:
-            tmp.write(file_data.read())
-            tmp_path = tmp.name
-
         try:
             publish_job_progress(job_id, 15, "parsing", "Parsing dataset...")
 
-            from pipeline.ingestion.file_handler import FileHandler
-            df = FileHandler.parse(tmp_path, detected_format)
+            dtype_map = _csv_dtypes(column_stats) if detected_format in ("csv", "tsv") else None
+            if dtype_map:
+                df = FileHandler.parse(tmp_path, detected_format, dtype=dtype_map)
+                if df.empty:
+                    # Stats no longer match the file; let pandas infer again
+                    df = FileHandler.parse(tmp_path, detected_format)
+            else:
+                df = FileHandler.parse(tmp_path, detected_format)
 
             if df.empty:
                 _fail_job(engine, job_id, "Dataset could not be parsed")
@@ -117,34 +136,50 @@ def run_common_pipeline(self, job_id: str) -> dict:
             # 4. Run pipeline
             publish_job_progress(job_id, 20, "pipeline", "Starting pipeline...")
 
-            from pipeline.common.runner import PipelineRunner
+
+            last_persisted_progress = 5
+            last_step: Optional[str] = None
 
             def progress_cb(progress: int, step: str, message: str) -> None:
+                nonlocal last_persisted_progress, last_step
                 # Scale progress to 20-90 range
                 scaled = 20 + int(progress * 0.7)
                 publish_job_progress(job_id, scaled, step, message)
-                # Update job progress in DB
+                # Redis holds the live value; only persist to the DB on a step
+                # change or once progress has moved far enough
+                if step == last_step and scaled - last_persisted_progress < PROGRESS_DB_MIN_DELTA:
+                    return
                 with Session(engine) as session:
-                    j = session.get(Job, job_id)
-                    if j:
-                        j.progress = scaled
-                        session.commit()
+                    session.execute(update(Job).where(Job.id == job_id).values(progress=scaled))
+                    session.commit()
+                last_persisted_progress, last_step = scaled, step
 
             runner = PipelineRunner()
-            result = runner.run(df, steps_config, job_id=job_id, progress_callback=progress_cb)
+            result = runner.run(df, steps_config, job_id=job_id, progress_callback=progress_cb, arrow_strings=True)
 
             publish_job_progress(job_id, 92, "saving", "Saving processed dataset...")
 
             # 5. Save to MinIO
             processed_path = f"processed/{job_id}/output.parquet"
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".parquet") as out_tmp:
-                result.df.to_parquet(out_tmp.name, index=False)
-                out_size = os.path.getsize(out_tmp.name)
-                with open(out_tmp.name, "rb") as f:
-                    minio_upload("dataforge-processed", processed_path, f, length=out_size)
-                os.unlink(out_tmp.name)
-
-            # 6. Update job
+            # zstd shrinks the upload (and later downloads) well beyond the snappy default
+            table = pa.Table.from_pandas(result.df, preserve_index=False)
+            parquet_opts = {"compression": "zstd", "compression_level": 3, "use_dictionary": True}
+            if table.nbytes <= PARQUET_IN_MEMORY_MAX_BYTES:
+                # Small enough to encode in memory and upload without touching disk
+                buf = io.BytesIO()
+                pq.write_table(table, buf, **parquet_opts)
+                out_size = buf.getbuffer().nbytes
+                buf.seek(0)
+                minio_upload("dataforge-processed", processed_path, buf, length=out_size)
+            else:
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".parquet") as out_tmp:
+                    pq.write_table(table, out_tmp.name, **parquet_opts)
+                    out_size = os.path.getsize(out_tmp.name)
+                    with open(out_tmp.name, "rb") as f:
+                        minio_upload("dataforge-processed", processed_path, f, length=out_size)
+                    os.unlink(out_tmp.name)
+
+            # 6. Summarize steps for the job record
             steps_summary = []
             for i, sr in enumerate(result.steps_results):
                 step_name = steps_config[i]["step"] if i < len(steps_config) else "unknown"
@@ -155,36 +190,34 @@ def run_common_pipeline(self, job_id: str) -> dict:
                     "rows_removed": sr.rows_removed,
                     "metadata": sr.metadata,
                     "warnings": sr.warnings,
+                    "duration_seconds": sr.duration_seconds,
                 })
 
+            # 7. Complete the job and create the ProcessedDataset in one transaction
+            pipeline_result = {
+                "total_rows_before": result.total_rows_before,
+                "total_rows_after": result.total_rows_after,
+                "total_rows_removed": result.total_rows_removed,
+                "duration_seconds": result.duration_seconds,
+                "steps": steps_summary,
+                "warnings": result.warnings,
+            }
+            config_patch = cast({"pipeline_result": pipeline_result, "output_path": processed_path}, JSONB)
             with Session(engine) as session:
-                j = session.get(Job, job_id)
-                if j:
-                    j.status = JobStatus.COMPLETED
-                    j.progress = 100
-                    j.config = {
-                        **(j.config or {}),
-                        "pipeline_result": {
-                            "total_rows_before": result.total_rows_before,
-                            "total_rows_after": result.total_rows_after,
-                            "total_rows_removed": result.total_rows_removed,
-                            "duration_seconds": result.duration_seconds,
-                            "steps": steps_summary,
-                            "warnings": result.warnings,
-                        },
-                        "output_path": processed_path,
-                    }
-                    session.commit()
-
-            # 7. Create ProcessedDataset
-            with Session(engine) as session:
-                processed = ProcessedDataset(
+                session.execute(
+                    update(Job).where(Job.id == job_id)
+                    .values(
+                        status=JobStatus.COMPLETED,
+                        progress=100,
+                        config=func.coalesce(Job.config, cast({}, JSONB)).op("||")(config_patch),
+                    )
+                )
+                session.add(ProcessedDataset(
                     job_id=job_id,
                     output_path=processed_path,
                     row_count=result.total_rows_after,
                     quality_score_avg=result.pipeline_stats.get("mean_quality_score"),
-                )
-                session.add(processed)
+                ))
                 session.commit()
 
             publish_job_progress(job_id, 100, "complete",
@@ -209,13 +242,20 @@ def run_common_pipeline(self, job_id: str) -> dict:
         return {"error": str(exc)}
 
 
-def _fail_job(engine, job_id: str, error_msg: str) -> None:
-    from sqlalchemy.orm import Session
-    from app.models.job import Job, JobStatus
+# Dtypes recorded at ingestion that can be handed back to read_csv as-is
+_CSV_SAFE_DTYPES = {"int64", "float64", "bool"}
 
+
+def _csv_dtypes(column_stats: list[dict]) -> dict:
+    """Build a read_csv dtype map from the per-column stats computed at ingestion."""
+    return {c["name"]: c["dtype"] for c in column_stats if c.get("dtype") in _CSV_SAFE_DTYPES}
+
+
+def _fail_job(engine, job_id: str, error_msg: str) -> None:
     with Session(engine) as session:
-        job = session.get(Job, job_id)
-        if job:
-            job.status = JobStatus.FAILED
-            job.error_message = error_msg if hasattr(job, "error_message") else None
-            session.commit()
+        session.execute(
+            update(Job).where(Job.id == job_id)
+            .values(status=JobStatus.FAILED, error_message=error_msg)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
@@ -3,7 +3,10 @@
 import logging
 import time
 
+import pandas as pd
+import redis
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
 
 from app.core.config import settings
 
@@ -23,9 +26,52 @@ celery_app.conf.update(
     enable_utc=True,
     task_track_started=True,
     task_acks_late=True,
+    # Safe default for the long pipeline tasks; the "fast" queue's worker
+    # overrides it with --prefetch-multiplier (see docker-compose.yml)
     worker_prefetch_multiplier=1,
+    # Short I/O-bound tasks must not queue behind multi-minute pipeline runs
+    task_routes={
+        "process_ingestion": {"queue": "fast"},
+        "test_task": {"queue": "fast"},
+        "run_common_pipeline": {"queue": "heavy"},
+        "run_finetune_pipeline": {"queue": "heavy"},
+        "run_job": {"queue": "heavy"},
+    },
 )
 
+# Shared by every task in a worker process for progress publishing. Creating the
+# pool does not connect, and redis-py resets it automatically after a fork.
+REDIS_POOL = redis.ConnectionPool.from_url(
+    settings.REDIS_URL,
+    max_connections=32,
+    socket_keepalive=True,
+    health_check_interval=30,
+    decode_responses=True,
+)
+
+# Progress events go to capped Redis streams (roughly this many entries each)
+# so late WebSocket subscribers can replay them
+PROGRESS_STREAM_MAXLEN = 1000
+
+
+def get_redis() -> redis.Redis:
+    """Return a client backed by the worker's shared connection pool."""
+    return redis.Redis(connection_pool=REDIS_POOL)
+
+
+@worker_init.connect
+@worker_process_init.connect
+def _enable_pandas_copy_on_write(**kwargs) -> None:
+    """Turn on pandas copy-on-write once for the whole worker process.
+
+    Pipeline steps start from shallow copies and share column buffers, so any
+    write into a shared frame must copy rather than leak back. The option is
+    process-global; setting it at startup instead of per run keeps it stable
+    for the threads that parse files and export splits concurrently.
+    """
+    pd.set_option("mode.copy_on_write", True)
+
+
 # Auto-discover tasks in pipeline/tasks/
 celery_app.autodiscover_tasks(["pipeline.tasks"])
 
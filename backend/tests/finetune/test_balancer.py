@@ -35,3 +35,15 @@ def test_balance_ratio_respected():
     counts = res.df["category"].value_counts()
     assert counts["A"] == 20
     assert counts["B"] == 10
+
+def test_oversample_caps_at_max_per_category():
+    step = CategoryBalancerStep()
+    df = pd.DataFrame({
+        "category": ["A"] * 100 + ["B"] * 10,
+        "text": [f"text {i}" for i in range(110)]
+    })
+    res = step.run(df, {"method": "oversample", "target_column": "category", "max_per_category": 50})
+    counts = res.df["category"].value_counts()
+    assert counts["A"] == 50
+    assert counts["B"] == 50
+    assert res.df["text"].nunique() == 60 # All minority rows kept, majority subsampled without replacement
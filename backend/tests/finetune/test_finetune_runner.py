@@ -63,3 +63,26 @@ def test_stratified_split_preserves_distribution():
     train_dist = res.train_df["_norm_instruction"].value_counts()
     assert train_dist.get("Do A", 0) == 8
     assert train_dist.get("Do B", 0) == 8
+
+def test_response_quality_reads_normalized_columns():
+    runner = FinetunePipelineRunner()
+    df = pd.DataFrame({
+        "prompt": ["Tell me about the history of Rome"] * 10,
+        "completion": ["Rome was founded, according to legend, in 753 BC by Romulus and Remus."] * 10
+    })
+
+    config = FinetuneConfig(
+        run_deduplication=False,
+        run_noise_removal=False,
+        run_pii_scrubbing=False,
+        run_quality_scoring=False,
+        output_format="openai",
+        train_split=0.8,
+        val_split=0.2
+    )
+
+    def mock_cb(prog, msg): pass
+    res = runner.run(df, config, "test_job_norm", mock_cb)
+
+    assert res.total_examples == 10
+    assert res.train_df["_norm_output"].str.startswith("Rome").all()
@@ -22,20 +22,56 @@ def test_auto_detects_sharegpt_format():
 
 def test_converts_to_openai_format_correctly():
     step = FinetuneFormatterStep()
-    res = step._format_row("Tell me a joke", "", "Why did the chicken cross the road?", "openai", "You are funny.")
+    df = pd.DataFrame({"instruction": ["Tell me a joke"], "input": [""], "output": ["Why did the chicken cross the road?"]})
+    res = step.run(df, {"output_format": "openai", "system_prompt": "You are funny."}).df["formatted_text"].iloc[0]
     assert "messages" in res
     assert len(res["messages"]) == 3
     assert res["messages"][0]["role"] == "system"
 
 def test_converts_to_llama3_format_correctly():
     step = FinetuneFormatterStep()
-    res = step._format_row("Test inst", "Test inp", "Test out", "llama3", "Sys prompt")
+    df = pd.DataFrame({"instruction": ["Test inst"], "input": ["Test inp"], "output": ["Test out"]})
+    res = step.run(df, {"output_format": "llama3", "system_prompt": "Sys prompt"}).df["formatted_text"].iloc[0]
     assert "<|begin_of_text|>" in res
     assert "<|start_header_id|>system<|end_header_id|>" in res
     assert "<|start_header_id|>user<|end_header_id|>" in res
     assert "<|start_header_id|>assistant<|end_header_id|>" in res
     assert "<|eot_id|>" in res
 
+_USER = {"role": "user", "content": "Tell me a joke\nabout cats"}
+_ASSISTANT = {"role": "assistant", "content": "Cats nap."}
+_ALPACA = {"instruction": "Tell me a joke", "input": "about cats", "output": "Cats nap."}
+_SHAREGPT = {"conversations": [{"from": "human", "value": "Tell me a joke\nabout cats"}, {"from": "gpt", "value": "Cats nap."}]}
+
+@pytest.mark.parametrize("output_format, system_prompt, expected", [
+    ("llama3", "Be funny.",
+     "<|begin_of_text|><|start_header_id|>system<|end_header_id|>\nBe funny.<|eot_id|>"
+     "<|start_header_id|>user<|end_header_id|>\nTell me a joke\nabout cats<|eot_id|>"
+     "<|start_header_id|>assistant<|end_header_id|>\nCats nap.<|eot_id|>"),
+    ("llama3", "",
+     "<|begin_of_text|><|start_header_id|>user<|end_header_id|>\nTell me a joke\nabout cats<|eot_id|>"
+     "<|start_header_id|>assistant<|end_header_id|>\nCats nap.<|eot_id|>"),
+    ("llama2", "Be funny.", "<s>[INST] <<SYS>>Be funny.<</SYS>> Tell me a joke\nabout cats [/INST] Cats nap. </s>"),
+    ("llama2", "", "<s>[INST] Tell me a joke\nabout cats [/INST] Cats nap. </s>"),
+    ("mistral", "Be funny.", "<s>[INST] Be funny.\n\nTell me a joke\nabout cats [/INST] Cats nap.</s>"),
+    ("mistral", "", "<s>[INST] Tell me a joke\nabout cats [/INST] Cats nap.</s>"),
+    ("gemma", "Be funny.",
+     "<start_of_turn>user\nBe funny.\n\nTell me a joke\nabout cats<end_of_turn>\n<start_of_turn>model\nCats nap.<end_of_turn>"),
+    ("gemma", "",
+     "<start_of_turn>user\nTell me a joke\nabout cats<end_of_turn>\n<start_of_turn>model\nCats nap.<end_of_turn>"),
+    ("alpaca", "Be funny.", _ALPACA),
+    ("alpaca", "", _ALPACA),
+    ("sharegpt", "Be funny.", _SHAREGPT),
+    ("sharegpt", "", _SHAREGPT),
+    ("openai", "Be funny.", {"messages": [{"role": "system", "content": "Be funny."}, _USER, _ASSISTANT]}),
+    ("openai", "", {"messages": [_USER, _ASSISTANT]}),
+])
+def test_formatted_text_for_every_output_format(output_format, system_prompt, expected):
+    step = FinetuneFormatterStep()
+    df = pd.DataFrame({"instruction": ["Tell me a joke"], "input": ["about cats"], "output": ["Cats nap."]})
+    res = step.run(df, {"output_format": output_format, "system_prompt": system_prompt})
+    assert res.df["formatted_text"].tolist() == [expected]
+
 def test_filters_examples_exceeding_max_tokens():
     step = FinetuneFormatterStep()
     df = pd.DataFrame({
@@ -57,3 +93,66 @@ def test_token_count_column_added():
     res = step.run(df, {})
     assert "token_count" in res.df.columns
     assert res.df["token_count"].iloc[0] > 0
+
+def test_repeated_rows_are_tokenized_once():
+    step = FinetuneFormatterStep()
+    df = pd.DataFrame({
+        "instruction": ["Say hi", "Say hi", "Say bye"],
+        "input": ["", "", ""],
+        "output": ["Hi", "Hi", "Bye"]
+    })
+    res = step.run(df, {"exact_token_counts": True})
+    counts = res.df["token_count"].tolist()
+    assert counts[0] == counts[1] > 0
+    assert sum(len(c) for c in step._tok_cache.values()) == 2
+
+def test_special_token_text_is_counted_not_rejected():
+    step = FinetuneFormatterStep()
+    df = pd.DataFrame({
+        "instruction": ["What does <|endoftext|> mean?"],
+        "input": [""],
+        "output": ["It marks the end of a document."]
+    })
+    res = step.run(df, {"exact_token_counts": True})
+    assert len(res.df) == 1
+    assert res.df["token_count"].iloc[0] > 0
+
+def test_keep_normalized_leaves_norm_columns():
+    step = FinetuneFormatterStep()
+    df = pd.DataFrame({
+        "instruction": ["Say hi"],
+        "input": [""],
+        "output": ["Hi"]
+    })
+    assert "_norm_output" not in step.run(df, {}).df.columns
+    res = step.run(df, {"keep_normalized": True})
+    assert res.df["_norm_instruction"].tolist() == ["Say hi"]
+    assert res.df["_norm_output"].tolist() == ["Hi"]
+
+def test_rows_within_byte_limit_get_estimated_token_count():
+    step = FinetuneFormatterStep()
+    df = pd.DataFrame({"instruction": ["Say hi"], "input": [""], "output": ["Hi"]})
+    res = step.run(df, {"output_format": "llama3"})
+    text = res.df["formatted_text"].iloc[0]
+    assert res.df["token_count"].tolist() == [max(1, len(text.encode()) // 4)]
+    assert res.metadata["token_counts_estimated"] == 1
+    assert step._tok_cache == {}
+
+def test_rows_over_byte_limit_are_tokenized_exactly():
+    step = FinetuneFormatterStep()
+    df = pd.DataFrame({"instruction": ["Say hi " * 50], "input": [""], "output": ["Hi " * 50]})
+    exact = step.run(df, {"output_format": "llama3", "exact_token_counts": True})
+    assert exact.metadata["token_counts_estimated"] == 0
+    byte_len = len(exact.df["formatted_text"].iloc[0].encode())
+    res = FinetuneFormatterStep().run(df, {"output_format": "llama3", "max_tokens_per_example": byte_len - 1})
+    assert res.metadata["token_counts_estimated"] == 0
+    assert res.df["token_count"].tolist() == exact.df["token_count"].tolist()
+
+@pytest.mark.parametrize("max_tokens", [0, -1])
+def test_non_positive_max_tokens_keeps_every_row(max_tokens):
+    step = FinetuneFormatterStep()
+    df = pd.DataFrame({"instruction": ["Say hi" * 5000, "Say hi"], "input": ["", ""], "output": ["Hi" * 5000, "Hi"]})
+    res = step.run(df, {"max_tokens_per_example": max_tokens})
+    assert len(res.df) == 2
+    assert res.rows_removed == 0
+    assert res.metadata["examples_filtered_token_limit"] == 0
@@ -34,3 +34,44 @@ def test_completeness_check():
     # Only the one ending in punctuation should remain. (Score deduction for incomplete brings it < 6.0)
     assert len(res.df) == 1
     assert "Rufus." in res.df["_norm_output"].iloc[0]
+
+@pytest.fixture
+def step():
+    return ResponseQualityStep()
+
+@pytest.fixture
+def rome_df():
+    return pd.DataFrame({
+        "_norm_instruction": ["Tell me about the history of Rome"],
+        "_norm_output": ["Rome was founded, according to legend, in 753 BC by Romulus and Remus."]
+    })
+
+@pytest.fixture
+def short_and_rome_df(rome_df):
+    short = pd.DataFrame({"_norm_instruction": ["Hi"], "_norm_output": ["ok"]})
+    return pd.concat([short, rome_df], ignore_index=True)
+
+def test_score_only_keeps_rows_with_reasons(step, short_and_rome_df):
+    res = step.run(short_and_rome_df, {"action": "score_only"})
+    assert len(res.df) == 2
+    assert res.df["_response_quality_reasons"].iloc[0] == "instruction_too_short,response_too_short,incomplete_response"
+    assert res.df["_response_quality_reasons"].iloc[1] == ""
+    assert res.df["_response_quality_score"].tolist() == [0.0, 10.0]
+
+def test_input_frame_not_modified(step, rome_df):
+    res = step.run(rome_df, {"action": "score_only"})
+    assert list(rome_df.columns) == ["_norm_instruction", "_norm_output"]
+    assert res.df is not rome_df
+    assert "_response_quality_score" in res.df.columns
+
+def test_avg_quality_score_reported_in_filter_mode(step, short_and_rome_df):
+    res = step.run(short_and_rome_df, {"action": "filter"})
+    assert len(res.df) == 1
+    assert res.metadata["avg_quality_score"] == 5.0
+    assert "_response_quality_score" not in res.df.columns
+
+def test_refusal_detection_ignores_case(step, rome_df):
+    refusal = rome_df.assign(_norm_output="AS AN AI language model, I do not have opinions on this.")
+    df = pd.concat([refusal, rome_df], ignore_index=True)
+    res = step.run(df, {"action": "score_only"})
+    assert res.df["_response_quality_reasons"].tolist() == ["refusal_detected", ""]
@@ -2,7 +2,9 @@
 
 import pandas as pd
 import pytest
-from pipeline.common.deduplication import DeduplicationStep
+from pipeline.common.deduplication import (
+    DeduplicationStep, _exact_duplicates_polars, _exact_duplicates_xxhash, _has_semantic_deps, pl, xxhash,
+)
 
 
 @pytest.fixture
@@ -49,7 +51,7 @@ def test_dedup_keeps_correct_row_when_keep_last(step, df_with_dupes):
 
 def test_semantic_dedup_falls_back_without_deps(step, df_with_dupes):
     result = step.run(df_with_dupes, {"method": "semantic"})
-    # Should fall back to exact dedup with a warning
+    # Should fall back to MinHash near-duplicate detection with a warning
     assert len(result.warnings) > 0 or result.metadata["exact_duplicates_removed"] >= 0
 
 
@@ -65,3 +67,79 @@ def test_empty_dataframe(step):
     result = step.run(df, {"method": "exact"})
     assert result.rows_before == 0
     assert result.rows_after == 0
+
+
+def test_exact_dedup_does_not_merge_values_across_columns(step):
+    df = pd.DataFrame({
+        "a": ["x|y", "x"],
+        "b": ["z", "y|z"],
+    })
+    result = step.run(df, {"method": "exact"})
+    assert result.rows_removed == 0
+
+
+@pytest.mark.skipif(_has_semantic_deps(), reason="MinHash is only the fallback when embedding deps are missing")
+def test_semantic_fallback_removes_near_duplicates(step):
+    df = pd.DataFrame({"text": [
+        "The quick brown fox jumps over the lazy dog near the river bank today",
+        "The quick brown fox jumps over the lazy dog near the river bank today!",
+        "An entirely different sentence about databases and query planners",
+    ]})
+    result = step.run(df, {"method": "semantic"})
+    assert result.metadata["exact_duplicates_removed"] == 0
+    assert result.metadata["semantic_duplicates_removed"] == 1
+    assert result.df["text"].tolist() == [df["text"][0], df["text"][2]]
+
+
+
+@pytest.mark.skipif(_has_semantic_deps(), reason="MinHash is only the fallback when embedding deps are missing")
+@pytest.mark.parametrize("keep, kept_ticket", [("first", 0), ("last", 1999)])
+def test_semantic_fallback_collapses_large_near_duplicate_cluster(step, keep, kept_ticket):
+    template = (
+        "Customer reported that the export button on the billing dashboard stops responding after "
+        "uploading a large CSV file; support reproduced the issue on Chrome and Firefox and escalated it. "
+    )
+    df = pd.DataFrame({"text": [f"{template}Ticket id {i}" for i in range(2000)] + ["An unrelated note about lunch"]})
+    result = step.run(df, {"method": "semantic", "keep": keep})
+    assert result.metadata["semantic_duplicates_removed"] == 1999
+    assert result.df["text"].tolist() == [f"{template}Ticket id {kept_ticket}", "An unrelated note about lunch"]
+
+
+@pytest.mark.skipif(_has_semantic_deps(), reason="MinHash is only the fallback when embedding deps are missing")
+def test_semantic_fallback_keep_false_drops_every_near_duplicate(step):
+    df = pd.DataFrame({"text": [
+        "The quick brown fox jumps over the lazy dog near the river bank today",
+        "An entirely different sentence about databases and query planners",
+        "The quick brown fox jumps over the lazy dog near the river bank today!",
+        "The quick brown fox jumps over the lazy dog near the river bank today!!",
+    ]})
+    result = step.run(df, {"method": "semantic", "keep": False})
+    assert result.metadata["semantic_duplicates_removed"] == 3
+    assert result.df["text"].tolist() == [df["text"][1]]
+
+@pytest.mark.skipif(pl is None, reason="polars not installed")
+@pytest.mark.parametrize("keep", ["first", "last", False])
+def test_polars_exact_dedup_matches_pandas(keep):
+    df = pd.DataFrame({"text": ["a", "b", "a", None, None, "b"], "n": [1, 2, 1, 3, 3, 4]})
+    expected = df.astype(str).duplicated(keep=keep)
+    assert _exact_duplicates_polars(df, ["text", "n"], keep).tolist() == expected.tolist()
+
+
+@pytest.mark.skipif(xxhash is None, reason="xxhash not installed")
+@pytest.mark.parametrize("keep", ["first", "last", False])
+def test_xxhash_exact_dedup_matches_pandas(keep):
+    df = pd.DataFrame({"text": ["a", "b", "a", None, None, "b"], "n": [1, 2, 1, 3, 3, 4]})
+    expected = df.astype(str).duplicated(keep=keep)
+    assert _exact_duplicates_xxhash(df, ["text", "n"], keep).tolist() == expected.tolist()
+
+
+def test_run_chunk_drops_rows_seen_in_earlier_chunks(step):
+    state: dict = {}
+    config = {"method": "exact"}
+    first = step.run_chunk(pd.DataFrame({"text": ["a", "b", "a"]}), config, state)
+    second = step.run_chunk(pd.DataFrame({"text": ["c", "b", "a", "d"]}), config, state)
+    assert first.df["text"].tolist() == ["a", "b"]
+    assert second.df["text"].tolist() == ["c", "d"]
+    assert second.metadata["exact_duplicates_removed"] == 2
+    assert second.metadata["cross_chunk_matching"].endswith("row digest, unverified")
+    assert state["seen_digests"].tolist() == sorted(state["seen_digests"].tolist())
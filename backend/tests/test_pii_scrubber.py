@@ -2,6 +2,7 @@
 
 import pandas as pd
 import pytest
+from pipeline.common import pii_scrubber
 from pipeline.common.pii_scrubber import PIIScrubberStep
 
 
@@ -56,3 +57,20 @@ def test_multiple_entity_types(step):
     df = pd.DataFrame({"text": ["john@example.com and (555) 123-4567"]})
     result = step.run(df, {"action": "redact", "entities": ["ALL"]})
     assert result.metadata["total_pii_instances"] >= 2
+
+
+@pytest.mark.skipif(pii_scrubber.re2 is None, reason="google-re2 not installed")
+def test_prefilter_matches_regex_only_scan(step, monkeypatch):
+    df = pd.DataFrame({"text": [
+        "SSN ١٢٣-٤٥-٦٧٨٩ on file",  # Arabic-Indic digits
+        "call 555 １２３ ４５６７ now",  # fullwidth digits
+        "mail john@example.com or visit https://example.com",
+        "nothing sensitive here",
+    ]})
+    config = {"action": "redact", "entities": ["ALL"]}
+    with_prefilter = step.run(df, config)
+    monkeypatch.setattr(pii_scrubber, "_build_prefilter", lambda entity_types: None)
+    without_prefilter = step.run(df, config)
+    assert with_prefilter.df["text"].tolist() == without_prefilter.df["text"].tolist()
+    assert with_prefilter.metadata == without_prefilter.metadata
+    assert "١٢٣" not in with_prefilter.df["text"][0]
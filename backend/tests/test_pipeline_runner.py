@@ -76,3 +76,103 @@ def test_single_step(runner, sample_df):
     result = runner.run(sample_df, [{"step": "deduplication", "config": {"method": "exact"}}], job_id="test-5")
     assert len(result.steps_results) == 1
     assert result.steps_results[0].metadata["exact_duplicates_removed"] >= 0
+
+
+def test_arrow_strings_give_same_results(runner, sample_df):
+    steps = [
+        {"step": "deduplication", "config": {"method": "exact"}},
+        {"step": "noise_removal", "config": {}},
+        {"step": "quality_scorer", "config": {"method": "heuristic"}},
+    ]
+    baseline = runner.run(sample_df, steps, job_id="test-6")
+    result = runner.run(sample_df, steps, job_id="test-6", arrow_strings=True)
+    assert result.df["text"].dtype == "string[pyarrow]"
+    assert result.df["text"].tolist() == baseline.df["text"].tolist()
+    assert result.df["quality_score"].tolist() == baseline.df["quality_score"].tolist()
+
+
+def test_input_frame_is_not_modified(runner, sample_df):
+    original = sample_df.copy()
+    steps = [
+        {"step": "noise_removal", "config": {}},
+        {"step": "pii_scrubbing", "config": {"action": "redact"}},
+    ]
+    result = runner.run(sample_df, steps, job_id="test-7")
+    assert "[REDACTED]" in " ".join(result.df["text"])
+    pd.testing.assert_frame_equal(sample_df, original)
+
+
+def test_streaming_run_matches_in_memory_run(runner, sample_df, tmp_path):
+    input_path = tmp_path / "input.arrow"
+    output_path = tmp_path / "output.arrow"
+    sample_df.to_feather(input_path)
+    steps = [
+        {"step": "deduplication", "config": {"method": "exact"}},
+        {"step": "noise_removal", "config": {}},
+        {"step": "quality_scorer", "config": {"method": "heuristic", "action": "score_only"}},
+    ]
+    baseline = runner.run(sample_df, steps, job_id="test-8")
+    # One row per chunk, so the duplicate is only caught across chunks
+    result = runner.run_streaming(str(input_path), str(output_path), steps, job_id="test-8", chunk_rows=1)
+
+    streamed = pd.read_feather(output_path)
+    pd.testing.assert_frame_equal(streamed, baseline.df.reset_index(drop=True), check_dtype=False)
+    assert result.total_rows_before == 5
+    assert result.total_rows_after == len(baseline.df)
+    assert result.pipeline_stats["chunks"] == 5
+    assert result.steps_results[0].metadata["exact_duplicates_removed"] == 1
+
+
+def test_streaming_run_skips_steps_that_cannot_stream(runner, sample_df, tmp_path):
+    input_path = tmp_path / "input.arrow"
+    sample_df.to_feather(input_path)
+    steps = [{"step": "deduplication", "config": {"method": "exact", "keep": "last"}}]
+    result = runner.run_streaming(str(input_path), str(tmp_path / "output.arrow"), steps, chunk_rows=2)
+    assert result.steps_results[0].metadata.get("skipped") is True
+    assert result.total_rows_after == 5
+
+
+def test_step_durations_are_recorded(runner, sample_df):
+    result = runner.run(sample_df, [{"step": "deduplication", "config": {"method": "exact"}}], job_id="test-9")
+    assert result.steps_results[0].duration_seconds >= 0
+
+
+def test_streaming_run_handles_column_null_in_first_chunk(runner, tmp_path):
+    input_path = tmp_path / "input.arrow"
+    output_path = tmp_path / "output.arrow"
+    pd.DataFrame({"text": ["a", "b", "c", "d"], "note": [None, None, "x", "y"]}).to_feather(input_path)
+    steps = [{"step": "noise_removal", "config": {}}]
+    result = runner.run_streaming(str(input_path), str(output_path), steps, chunk_rows=2)
+    assert result.total_rows_after == 4
+    assert pd.read_feather(output_path)["note"].tolist() == [None, None, "x", "y"]
+
+
+def test_streaming_run_reports_step_failing_mid_run_as_partial(runner, sample_df, tmp_path, monkeypatch):
+    from pipeline.common.quality_scorer import QualityScorerStep
+
+    input_path = tmp_path / "input.arrow"
+    output_path = tmp_path / "output.arrow"
+    sample_df.to_feather(input_path)
+    original_run = QualityScorerStep.run
+    calls = []
+
+    def fail_on_third_chunk(self, df, config):
+        calls.append(len(df))
+        if len(calls) == 3:
+            raise RuntimeError("boom")
+        return original_run(self, df, config)
+
+    # The scorer adds columns, so later chunks are written without them
+    monkeypatch.setattr(QualityScorerStep, "run", fail_on_third_chunk)
+    steps = [{"step": "quality_scorer", "config": {"method": "heuristic", "action": "score_only"}}]
+    result = runner.run_streaming(str(input_path), str(output_path), steps, chunk_rows=2)
+
+    metadata = result.steps_results[0].metadata
+    assert metadata["partial"] is True
+    assert metadata["chunks_applied"] == "1-2"
+    assert result.pipeline_stats["steps_partial"] == 1
+    assert any("only applied to chunks 1-2 of 3" in w for w in result.warnings)
+
+    streamed = pd.read_feather(output_path)
+    assert streamed["text"].tolist() == sample_df["text"].tolist()
+    assert streamed["quality_score"].notna().tolist() == [True, True, True, True, False]
@@ -72,3 +72,11 @@ def test_empty_dataframe(step):
     df = pd.DataFrame({"text": []})
     result = step.run(df, {"method": "heuristic"})
     assert result.rows_before == 0
+
+
+def test_batch_scores_match_single_row_scores(step):
+    texts = ["ALL CAPS SHOUTING TEXT HERE!!", "Ünïcödé Text with ß and Ж.", "123 456 789 ###", "Fine. " * 5]
+    scores, reasons = step._heuristic_scores(texts)
+    assert list(zip(scores, reasons)) == [step._heuristic_score(t) for t in texts]
+    assert "Excessive caps" in reasons[0]
+    assert "High special char ratio" in reasons[2]